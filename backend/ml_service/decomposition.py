@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Batched Seasonal Decomposition
+Splits every route's daily contamination series into trend, weekly and
+yearly seasonal components and residuals in one vectorized pass over a
+routes x days matrix, cached against the data watermark
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+from sarima_predictor import get_db_connection, event_window_clause, fetch_routes
+
+# Configuration
+WEEKLY_PERIOD = 7
+YEARLY_PERIOD = 365
+SHORT_TREND_WINDOW = 35      # 5 weeks: cancels the weekly cycle when there is no yearly component
+CACHE_PATH = os.getenv(
+    'DECOMPOSITION_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'decomposition_cache.npz')
+)
+
+COMPONENTS = ['observed', 'trend', 'weekly', 'yearly', 'residual']
+
+
+def centered_moving_average(X, window):
+    """
+    Centered moving average along axis 1 of a 2-D array
+
+    The window shrinks at the edges instead of leaving NaNs, so every day
+    gets a trend value.
+
+    Args:
+        X: (series x days) array
+        window: Odd window length in days
+    """
+    days = X.shape[1]
+    half = window // 2
+    cumulative = np.concatenate([np.zeros((X.shape[0], 1)), np.cumsum(X, axis=1)], axis=1)
+    index = np.arange(days)
+    lo = np.clip(index - half, 0, days)
+    hi = np.clip(index + half + 1, 0, days)
+    return (cumulative[:, hi] - cumulative[:, lo]) / (hi - lo)
+
+
+def phase_means(X, phase, period, mask=None):
+    """
+    Mean of each row at each phase of a cycle, centered to zero mean
+
+    Args:
+        X: (series x days) array
+        phase: Phase (0..period-1) of each day
+        period: Number of phases
+        mask: Optional boolean array selecting which days to average over
+
+    Returns:
+        (series x period) array of seasonal offsets
+    """
+    if mask is not None:
+        X = X[:, mask]
+        phase = phase[mask]
+    rows = X.shape[0]
+    flat = (np.arange(rows)[:, None] * period + phase[None, :]).ravel()
+    sums = np.bincount(flat, weights=X.ravel(), minlength=rows * period).reshape(rows, period)
+    counts = np.bincount(phase, minlength=period)
+    means = sums / np.maximum(counts, 1)
+    # Center on the mean over days (phases weighted by how often they occur)
+    center = (means * counts).sum(axis=1, keepdims=True) / counts.sum()
+    return np.where(counts > 0, means - center, 0.0)
+
+
+def decompose_matrix(Y, dates):
+    """
+    Additive decomposition of every row of a routes x days matrix
+
+    trend:    centered moving average (365 days with 2+ years of data,
+              otherwise 35 days)
+    yearly:   day-of-year profile of the detrended series, weekly cycle
+              smoothed out first and averaged over days where the trend
+              window is complete; zero with less than 2 years of data
+    weekly:   day-of-week profile of what remains
+    residual: observed - trend - yearly - weekly
+
+    Args:
+        Y: (routes x days) array of daily counts
+        dates: datetime64[D] array, one per column
+
+    Returns:
+        Dict of (routes x days) arrays keyed by COMPONENTS
+    """
+    Y = np.asarray(Y, dtype=float)
+    days = Y.shape[1]
+    dates = np.asarray(dates, dtype='datetime64[D]')
+
+    # 1970-01-05 was a Monday, so phase 0 = Monday
+    weekday = ((dates - np.datetime64('1970-01-05', 'D')).astype(np.int64)) % WEEKLY_PERIOD
+    day_of_year = (dates - dates.astype('datetime64[Y]').astype('datetime64[D]')).astype(np.int64)
+
+    if days >= 2 * YEARLY_PERIOD:
+        trend = centered_moving_average(Y, YEARLY_PERIOD)
+        smoothed = centered_moving_average(Y - trend, WEEKLY_PERIOD)
+        # Edge trend values come from shrunken windows that absorb part of the season
+        interior = np.zeros(days, dtype=bool)
+        interior[YEARLY_PERIOD // 2:days - YEARLY_PERIOD // 2] = True
+        yearly = phase_means(smoothed, day_of_year, YEARLY_PERIOD + 1, interior)[:, day_of_year]
+    else:
+        trend = centered_moving_average(Y, SHORT_TREND_WINDOW)
+        yearly = np.zeros_like(Y)
+
+    weekly = phase_means(Y - trend - yearly, weekday, WEEKLY_PERIOD)[:, weekday]
+
+    return {
+        'observed': Y,
+        'trend': trend,
+        'weekly': weekly,
+        'yearly': yearly,
+        'residual': Y - trend - yearly - weekly,
+    }
+
+
+def fetch_watermark(days):
+    """
+    Data watermark for the cache: latest pickup / contamination IDs and today
+
+    Any insert bumps one of the IDs, and the window moves with CURRENT_DATE.
+    Updates or deletes of existing rows are not detected.
+    """
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT
+                (SELECT COALESCE(MAX(pickup_id), 0) FROM pickups),
+                (SELECT COALESCE(MAX(contamination_id), 0) FROM contamination_events),
+                CURRENT_DATE
+        """)
+        max_pickup, max_contamination, today = cursor.fetchone()
+    finally:
+        conn.close()
+    return f"{max_pickup}:{max_contamination}:{today}:{days}", np.datetime64(today, 'D')
+
+
+def fetch_route_day_matrix(today, days=730):
+    """
+    Daily contamination counts for every active route as one matrix
+
+    Args:
+        today: Last day of the window (datetime64[D])
+        days: Number of days of history
+
+    Returns:
+        Tuple of (routes list of dicts, dates array, routes x days count matrix)
+    """
+    routes = fetch_routes()
+    dates = np.arange(today - days + 1, today + 1)
+
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT
+                p.route_id,
+                DATE_TRUNC('day', p.pickup_time)::date as date,
+                COUNT(ce.contamination_id) as contamination_count
+            FROM pickups p
+            LEFT JOIN contamination_events ce ON p.pickup_id = ce.pickup_id%s
+            WHERE p.pickup_time >= CURRENT_DATE - INTERVAL '%s days'
+            GROUP BY p.route_id, DATE_TRUNC('day', p.pickup_time)::date
+        """ % (event_window_clause(days - 1), days - 1))
+        rows = cursor.fetchall()
+    finally:
+        conn.close()
+
+    route_ids = np.array([route['route_id'] for route in routes], dtype=np.int64)
+    Y = np.zeros((len(routes), days))
+    if rows and len(routes):
+        row_route = np.array([row[0] for row in rows], dtype=np.int64)
+        offsets = (np.array([row[1] for row in rows], dtype='datetime64[D]') - dates[0]).astype(np.int64)
+        counts = np.array([row[2] for row in rows], dtype=float)
+
+        order = np.argsort(route_ids)
+        pos = np.minimum(np.searchsorted(route_ids[order], row_route), len(route_ids) - 1)
+        row_index = order[pos]
+        keep = (route_ids[row_index] == row_route) & (offsets >= 0) & (offsets < days)
+        np.add.at(Y, (row_index[keep], offsets[keep]), counts[keep])
+
+    return routes, dates, Y
+
+
+def load_cache(path, watermark):
+    """Cached decomposition if it was computed at this watermark, else None"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            if str(data['watermark']) != watermark:
+                return None
+            return {key: data[key] for key in data.files}
+    except Exception:
+        # Any unreadable cache (e.g. BadZipFile) is a miss, not a failed request
+        return None
+
+
+def save_cache(path, result):
+    """
+    Write the cache atomically
+
+    Each request runs in its own process, so two can write at once: write
+    a temp file in the same directory and os.replace it into place. Writing
+    through a file handle keeps np.savez from appending .npz to path.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **result)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def route_decompositions(days=730, cache_path=CACHE_PATH):
+    """
+    Decomposition of every active route, from cache when the data is unchanged
+
+    Args:
+        days: Number of days of history
+        cache_path: .npz cache file (None disables caching)
+
+    Returns:
+        Dict with route_id, route_code, dates and one (routes x days) array per component
+    """
+    watermark, today = fetch_watermark(days)
+    if cache_path:
+        cached = load_cache(cache_path, watermark)
+        if cached is not None:
+            return cached
+
+    routes, dates, Y = fetch_route_day_matrix(today, days)
+    result = {key: value.astype(np.float32) for key, value in decompose_matrix(Y, dates).items()}
+    result['route_id'] = np.array([route['route_id'] for route in routes], dtype=np.int64)
+    result['route_code'] = np.array([route['route_code'] for route in routes], dtype=str)
+    result['dates'] = dates
+    result['watermark'] = np.array(watermark)
+
+    if cache_path:
+        save_cache(cache_path, result)
+    return result
+
+
+def iter_decompositions(days=730, cache_path=CACHE_PATH):
+    """
+    Yield one decomposition record per route
+
+    Args:
+        days: Number of days of history
+        cache_path: .npz cache file (None disables caching)
+    """
+    result = route_decompositions(days, cache_path)
+    dates = [str(d) for d in result['dates']]
+    for i, route_id in enumerate(result['route_id']):
+        record = {
+            'route_id': int(route_id),
+            'route_code': str(result['route_code'][i]),
+            'dates': dates,
+        }
+        for component in COMPONENTS:
+            record[component] = np.round(result[component][i].astype(float), 3).tolist()
+        yield record
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Hierarchical Forecasting
+Forecasts the system total -> facility -> route -> route x category tree
+(plus category totals across routes) from one series store load and
+reconciles them, so route forecasts add up to their facility and
+facilities to the system total.
+
+Reconciliation methods (A sums route x category series into every
+aggregate node):
+    bottom_up:  fit only the route x category series and sum them up
+    middle_out: fit only the routes, split each route forecast over its
+                categories by recent shares, then sum up
+    mint:       MinT with a diagonal covariance (WLS) - bottom series get
+                the batched lite model, aggregates their own model
+                (SARIMA unless lite), and every level contributes,
+                weighted by its fit
+"""
+
+import numpy as np
+
+from sarima_predictor import (INTERVAL_LEVELS, LITE_MODE, predict_future_trends_lite_batch, forecast_batch,
+                              interval_z, interval_bounds, horizon_scale, with_intervals)
+from series_store import get_series_store, take_rows, window
+
+# Configuration
+LEVELS = ['total', 'facility', 'route', 'category', 'route_category']
+METHODS = ['bottom_up', 'middle_out', 'mint']
+SHARE_DAYS = 90              # history used for middle-out category shares
+MIN_VARIANCE = 1e-6          # floor for MinT weights (all-zero series fit exactly)
+
+
+def hierarchy_data(store, days=365):
+    """
+    Route x category series of the active routes, from the series store
+
+    Args:
+        store: Series store (see series_store.py)
+        days: Number of days of history
+
+    Returns:
+        Dict with routes (route_id, route_code, facility_id, facility_name
+        tuples), categories (category_id, code, description tuples), dates
+        and (route x category) x days count and severity-sum matrices,
+        route-major
+    """
+    active = np.flatnonzero(store['route_active'])
+    routes = [(int(store['route_id'][i]), str(store['route_code'][i]),
+               int(store['facility_id'][i]), str(store['facility_name'][i])) for i in active]
+    categories = list(zip(store['category_id'].tolist(), store['category_code'].tolist(),
+                          store['category_description'].tolist()))
+    n_days = window(store['dates'], days).shape[0]
+
+    def bottom(key):
+        # int32 views when every route is active; models convert to float themselves
+        return take_rows(window(store[key], days), active).reshape(-1, n_days)
+
+    return {
+        'routes': routes,
+        'categories': categories,
+        'dates': window(store['dates'], days),
+        'counts': bottom('events'),
+        'severity': bottom('severity'),
+    }
+
+
+def build_hierarchy(routes, categories):
+    """
+    Nodes of the aggregation tree and the aggregation matrix A
+
+    Bottom series are route x category, route-major. Node order is total,
+    facilities, routes, categories, then the bottom series, so the full
+    summing matrix is S = [A; I].
+
+    Args:
+        routes: (route_id, route_code, facility_id, facility_name) tuples
+        categories: (category_id, code, description) tuples
+
+    Returns:
+        Tuple of (node dicts, (aggregate nodes x bottom) 0/1 matrix A,
+        level array)
+    """
+    n_categories = len(categories)
+    facilities = sorted({(route[2], route[3]) for route in routes})
+    facility_pos = {facility_id: i for i, (facility_id, _) in enumerate(facilities)}
+
+    bottom_route = np.repeat(np.arange(len(routes)), n_categories)
+    bottom_category = np.tile(np.arange(n_categories), len(routes))
+    bottom_facility = np.array([facility_pos[routes[r][2]] for r in bottom_route], dtype=np.int64)
+
+    def indicator(groups, group_of_bottom):
+        return (np.arange(groups)[:, None] == group_of_bottom[None, :]).astype(float)
+
+    A = np.vstack([
+        np.ones((1, len(bottom_route))),
+        indicator(len(facilities), bottom_facility),
+        indicator(len(routes), bottom_route),
+        indicator(n_categories, bottom_category),
+    ])
+
+    nodes = [{'level': 'total'}]
+    nodes += [{'level': 'facility', 'facility_id': facility_id, 'facility_name': name}
+              for facility_id, name in facilities]
+    nodes += [{'level': 'route', 'route_id': route_id, 'route_code': code, 'facility_id': facility_id}
+              for route_id, code, facility_id, _ in routes]
+    nodes += [{'level': 'category', 'category_id': category_id, 'code': code, 'description': description}
+              for category_id, code, description in categories]
+    nodes += [{'level': 'route_category', 'route_id': routes[r][0], 'route_code': routes[r][1],
+               'category_id': categories[c][0], 'code': categories[c][1]}
+              for r, c in zip(bottom_route, bottom_category)]
+
+    levels = np.array([node['level'] for node in nodes])
+    return nodes, A, levels
+
+
+def base_forecasts(dates, counts, A, levels, forecast_days=30, method='mint', seasonal_period=7,
+                   lite=LITE_MODE, resolution='daily'):
+    """
+    Base forecasts for the rows a reconciliation method uses
+
+    The lite model is linear in the data, so lite forecasts of the
+    aggregates would equal the sums of the bottom forecasts already.
+    bottom_up and middle_out only fit the rows they keep; mint fits the
+    aggregate nodes with forecast_batch so their forecasts can disagree
+    with the bottom ones (with lite daily they can't, and mint matches
+    bottom_up).
+
+    Args:
+        dates: Dates of the history columns
+        counts: (bottom x days) route x category history
+        A: (aggregate nodes x bottom) aggregation matrix
+        levels: Level name per node
+        forecast_days: Number of days to forecast ahead
+        method: 'bottom_up', 'middle_out' or 'mint'
+        seasonal_period: Seasonal period of the lite model
+        lite: Fit mint's aggregate nodes with the lite model instead of SARIMA
+        resolution: Resolution of mint's aggregate models
+
+    Returns:
+        Tuple of (rows x horizon) base forecasts and their residual
+        variance: bottom rows (bottom_up), route rows (middle_out) or every
+        node (mint)
+    """
+    if method == 'bottom_up':
+        return predict_future_trends_lite_batch(counts, forecast_days, seasonal_period)
+
+    if method == 'middle_out':
+        route_rows = np.flatnonzero(levels == 'route')
+        return predict_future_trends_lite_batch(A[route_rows] @ counts, forecast_days, seasonal_period)
+
+    if method == 'mint':
+        bottom, bottom_var = predict_future_trends_lite_batch(counts, forecast_days, seasonal_period)
+        batch = forecast_batch(dates, A @ counts, forecast_days, lite=lite, resolution=resolution)
+        # One-step standard error from the first interval, as the node's weight
+        se = (batch['upper_bound'][0, :, 0] - batch['lower_bound'][0, :, 0]) / (2 * interval_z(INTERVAL_LEVELS)[0])
+        ok = batch['ok']
+        # Aggregates with too little history fall back to the bottom-up sum
+        aggregate = np.where(ok[:, None], batch['forecast'], A @ bottom)
+        aggregate_var = np.where(ok, se ** 2, A @ bottom_var)
+        return np.vstack([aggregate, bottom]), np.r_[aggregate_var, bottom_var]
+
+    raise ValueError("method must be one of %s, got %r" % (', '.join(METHODS), method))
+
+
+def reconcile(base, residual_var, A, levels, history, method='mint'):
+    """
+    Make base forecasts coherent (every aggregate = sum of its bottom series)
+
+    Works on A rather than the full S = [A; I], so the cost grows with
+    aggregates x bottom series instead of nodes squared.
+
+    Args:
+        base: Base forecasts from base_forecasts (rows depend on method)
+        residual_var: Residual variance of each base row
+        A: (aggregate nodes x bottom) aggregation matrix
+        levels: Level name per node
+        history: (nodes x days) observed values, for middle-out shares
+        method: 'bottom_up', 'middle_out' or 'mint'
+
+    Returns:
+        Tuple of ((nodes x horizon) reconciled forecasts, forecast error
+        variance per node, assuming independent base errors)
+    """
+    n_aggregate = A.shape[0]
+
+    if method == 'bottom_up':
+        return np.vstack([A @ base, base]), np.r_[A @ residual_var, residual_var]
+
+    if method == 'middle_out':
+        route_rows = np.flatnonzero(levels == 'route')
+        route_of_bottom = A[route_rows].argmax(axis=0)
+        recent = history[n_aggregate:, -SHARE_DAYS:].sum(axis=1)
+        route_totals = np.bincount(route_of_bottom, weights=recent, minlength=len(route_rows))
+        per_route = np.bincount(route_of_bottom, minlength=len(route_rows))
+        shares = np.where(route_totals[route_of_bottom] > 0,
+                          recent / np.maximum(route_totals[route_of_bottom], 1e-12),
+                          1.0 / np.maximum(per_route[route_of_bottom], 1))
+        # bottom = D @ route forecasts; the categories of one route share its error
+        D = np.zeros((len(route_of_bottom), len(route_rows)))
+        D[np.arange(len(route_of_bottom)), route_of_bottom] = shares
+        mapping = np.vstack([A @ D, D])
+        return mapping @ base, (mapping ** 2) @ residual_var
+
+    if method == 'mint':
+        # WLS projection onto the coherent subspace: with constraints
+        # C y = 0, C = [I, -A] and W = diag(residual variance),
+        # y~ = y^ - W C' (C W C')^-1 C y^, and Var(y~) = W - W C' (C W C')^-1 C W
+        w = np.maximum(residual_var, MIN_VARIANCE)
+        w_aggregate, w_bottom = w[:n_aggregate], w[n_aggregate:]
+        K = np.diag(w_aggregate) + (A * w_bottom) @ A.T
+        U = np.vstack([np.diag(w_aggregate), -(A * w_bottom).T])  # W C'
+        forecast = base - U @ np.linalg.solve(K, base[:n_aggregate] - A @ base[n_aggregate:])
+        variance = w - ((U @ np.linalg.inv(K)) * U).sum(axis=1)
+        return forecast, np.maximum(variance, 0.0)
+
+    raise ValueError("method must be one of %s, got %r" % (', '.join(METHODS), method))
+
+
+def hierarchical_forecast(days=365, forecast_days=30, method='mint', seasonal_period=7, store=None,
+                          interval_levels=INTERVAL_LEVELS, lite=LITE_MODE, resolution='daily'):
+    """
+    Coherent forecasts for every node of the hierarchy
+
+    Base forecasts come from base_forecasts; intervals widen with the
+    horizon the same way as the lite model.
+
+    Args:
+        days: Number of days of history
+        forecast_days: Number of days to forecast ahead
+        method: Reconciliation method ('bottom_up', 'middle_out' or 'mint')
+        seasonal_period: Seasonal period of the lite base model
+        store: Series store to read from (loaded if not given)
+        interval_levels: Confidence levels of the intervals
+        lite: Fit mint's aggregate nodes with the lite model instead of SARIMA
+        resolution: Resolution of mint's aggregate models
+
+    Returns:
+        Dict with nodes, dates, (nodes x days) history / severity,
+        (nodes x forecast_days) forecast and (levels x nodes x
+        forecast_days) lower_bound / upper_bound arrays
+    """
+    if store is None:
+        store = get_series_store(days=days)
+    data = hierarchy_data(store, days)
+    nodes, A, levels = build_hierarchy(data['routes'], data['categories'])
+    history = np.vstack([A @ data['counts'], data['counts']])
+
+    base, residual_var = base_forecasts(data['dates'], data['counts'], A, levels, forecast_days, method,
+                                        seasonal_period, lite, resolution)
+    forecast, variance = reconcile(base, residual_var, A, levels, history, method)
+
+    scale = np.sqrt(variance)[:, None] * horizon_scale(forecast_days, seasonal_period)
+    lower, upper = interval_bounds(forecast, scale, interval_levels)
+
+    return {
+        'nodes': nodes,
+        'dates': data['dates'],
+        'history': history,
+        'severity': np.vstack([A @ data['severity'], data['severity']]),
+        'forecast': forecast,
+        'lower_bound': lower,
+        'upper_bound': upper,
+    }
+
+
+def iter_hierarchy_forecasts(days=365, forecast_days=30, method='mint', levels=None, store=None,
+                             interval_levels=INTERVAL_LEVELS, lite=LITE_MODE, resolution='daily'):
+    """
+    Yield one coherent forecast record per hierarchy node
+
+    Args:
+        days: Number of days of history
+        forecast_days: Number of days to forecast ahead
+        method: Reconciliation method ('bottom_up', 'middle_out' or 'mint')
+        levels: Levels to emit (default: all)
+        store: Series store to read from (loaded if not given)
+        interval_levels: Confidence levels of the intervals
+        lite: Fit mint's aggregate nodes with the lite model instead of SARIMA
+        resolution: Resolution of mint's aggregate models
+    """
+    result = hierarchical_forecast(days, forecast_days, method, store=store, interval_levels=interval_levels,
+                                   lite=lite, resolution=resolution)
+    history = result['history']
+    if history.shape[1] < 14:  # Need at least 2 weeks of data
+        return
+
+    recent_events = history[:, -7:].sum(axis=1)
+    recent_severity = result['severity'][:, -7:].sum(axis=1)
+    recent_avg = recent_events / 7.0
+    last = result['forecast'][:, -1]
+    expected_change = (last - recent_avg) / np.maximum(recent_avg, 1) * 100
+
+    for i, node in enumerate(result['nodes']):
+        if levels and node['level'] not in levels:
+            continue
+        yield with_intervals(dict(
+            node,
+            method=method,
+            trend='increasing' if last[i] > recent_avg[i] else 'decreasing',
+            expected_change=float(expected_change[i]),
+            recent_events=int(recent_events[i]),
+            avg_severity=float(recent_severity[i] / recent_events[i]) if recent_events[i] else None,
+            forecast=result['forecast'][i],
+            lower_bound=result['lower_bound'][0, i],
+            upper_bound=result['upper_bound'][0, i],
+        ), result['lower_bound'][:, i], result['upper_bound'][:, i], interval_levels)
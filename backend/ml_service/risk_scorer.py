@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""
+Container / Customer Contamination Risk Scoring
+Scores every container in one batched NumPy pass from recency-weighted
+pickup and contamination event history, for targeting outreach campaigns
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+import warnings
+warnings.filterwarnings('ignore')
+
+import numpy as np
+
+from sarima_predictor import get_db_connection
+
+# Configuration
+HALF_LIFE_DAYS = 90          # An event 90 days old counts half as much as one today
+HISTORY_DAYS = 730           # Full scoring window; older history weighs <0.5%
+PRIOR_PICKUPS = 2.0          # Pseudo-pickups at the system-wide rate (smooths sparse containers)
+STATE_PATH = os.getenv('RISK_STATE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'risk_state.npz'))
+
+# Feature weights for the final score (columns of the feature matrix)
+FEATURES = ['event_rate', 'severity', 'category', 'recency']
+FEATURE_WEIGHTS = np.array([0.45, 0.25, 0.15, 0.15])
+
+DECAY = np.log(2) / HALF_LIFE_DAYS
+SECONDS_PER_DAY = 86400.0
+
+
+def fetch_containers(conn, container_ids=None):
+    """
+    Fetch container -> customer / route metadata
+
+    Args:
+        conn: Database connection
+        container_ids: Optional list of container IDs to restrict to
+
+    Returns:
+        List of (container_id, customer_id, customer_name, route_id, route_code) tuples
+    """
+    query = """
+        SELECT c.container_id, cu.customer_id, cu.name, r.route_id, r.route_code
+        FROM containers c
+        INNER JOIN customers cu ON c.customer_id = cu.customer_id
+        INNER JOIN routes r ON cu.route_id = r.route_id
+        WHERE c.active = TRUE
+    """
+    params = None
+    if container_ids is not None:
+        query += " AND c.container_id = ANY(%s)"
+        params = (list(container_ids),)
+    query += " ORDER BY c.container_id"
+
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    return cursor.fetchall()
+
+
+def fetch_activity(conn, since_pickup_id=0, since_contamination_id=0, days=HISTORY_DAYS):
+    """
+    Fetch pickups and contamination events as flat NumPy arrays
+
+    Args:
+        conn: Database connection
+        since_pickup_id: Only pickups with a higher pickup_id (incremental mode)
+        since_contamination_id: Only events with a higher contamination_id
+        days: History window in days
+
+    Returns:
+        Dict of arrays: pickup_id, pickup_container, pickup_time (epoch days),
+        event_id, event_container, event_time, event_severity, event_category
+    """
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        SELECT p.pickup_id, p.container_id, EXTRACT(EPOCH FROM p.pickup_time)
+        FROM pickups p
+        WHERE p.pickup_id > %s
+          AND p.pickup_time >= CURRENT_DATE - make_interval(days => %s)
+    """, (since_pickup_id, days))
+    pickups = np.array(cursor.fetchall(), dtype=float).reshape(-1, 3)
+
+    cursor.execute("""
+        SELECT ce.contamination_id, p.container_id, EXTRACT(EPOCH FROM p.pickup_time),
+               ce.severity, ce.category_id
+        FROM contamination_events ce
+        INNER JOIN pickups p ON ce.pickup_id = p.pickup_id
+        WHERE ce.contamination_id > %s
+          AND p.pickup_time >= CURRENT_DATE - make_interval(days => %s)
+    """, (since_contamination_id, days))
+    events = np.array(cursor.fetchall(), dtype=float).reshape(-1, 5)
+
+    return {
+        'pickup_id': pickups[:, 0].astype(np.int64),
+        'pickup_container': pickups[:, 1].astype(np.int64),
+        'pickup_time': pickups[:, 2] / SECONDS_PER_DAY,
+        'event_id': events[:, 0].astype(np.int64),
+        'event_container': events[:, 1].astype(np.int64),
+        'event_time': events[:, 2] / SECONDS_PER_DAY,
+        'event_severity': events[:, 3],
+        'event_category': events[:, 4].astype(np.int64),
+    }
+
+
+def category_weights(severity, category, num_categories):
+    """
+    Per-category risk weight: mean severity of the category's events, scaled to 0-1
+
+    Categories with no events get the overall mean.
+    """
+    counts = np.bincount(category, minlength=num_categories)
+    totals = np.bincount(category, weights=severity, minlength=num_categories)
+    overall = severity.mean() if len(severity) else 3.0
+    mean_severity = np.where(counts > 0, totals / np.maximum(counts, 1), overall)
+    return (mean_severity - 1) / 4
+
+
+def container_rows(state, container_ids):
+    """State row index for each container ID (-1 where unknown)"""
+    order = np.argsort(state['container_id'], kind='stable')
+    sorted_ids = state['container_id'][order]
+    pos = np.minimum(np.searchsorted(sorted_ids, container_ids), max(len(sorted_ids) - 1, 0))
+    if not len(sorted_ids):
+        return np.full(len(container_ids), -1, dtype=np.int64)
+    return np.where(sorted_ids[pos] == container_ids, order[pos], -1)
+
+
+def add_categories(state, activity):
+    """
+    Grow the per-category accumulators for categories first seen after the full run
+
+    New categories are weighted by the severity of their events in activity.
+    """
+    num_categories = state['category_events'].shape[1]
+    needed = int(activity['event_category'].max()) + 1 if len(activity['event_category']) else 0
+    if needed <= num_categories:
+        return
+    weights = category_weights(activity['event_severity'], activity['event_category'], needed)
+    state['category_events'] = np.hstack([
+        state['category_events'], np.zeros((len(state['container_id']), needed - num_categories))
+    ])
+    state['category_weight'] = np.concatenate([state['category_weight'], weights[num_categories:]])
+
+
+def accumulate(state, activity, now):
+    """
+    Add recency-weighted pickup / event contributions into the state accumulators
+
+    Rows for containers not yet in the state are ignored; callers add those
+    containers first (see add_containers). Categories are added as needed.
+    """
+    add_categories(state, activity)
+    n = len(state['container_id'])
+    num_categories = state['category_events'].shape[1]
+
+    if len(activity['pickup_container']):
+        rows = container_rows(state, activity['pickup_container'])
+        keep = rows >= 0
+        weights = np.exp(-DECAY * (now - activity['pickup_time'][keep]))
+        state['pickups'] += np.bincount(rows[keep], weights=weights, minlength=n)
+
+    if len(activity['event_container']):
+        rows = container_rows(state, activity['event_container'])
+        keep = rows >= 0
+        rows = rows[keep]
+        event_time = activity['event_time'][keep]
+        weights = np.exp(-DECAY * (now - event_time))
+        state['events'] += np.bincount(rows, weights=weights, minlength=n)
+        state['severity'] += np.bincount(rows, weights=weights * activity['event_severity'][keep], minlength=n)
+        flat = rows * num_categories + activity['event_category'][keep]
+        state['category_events'] += np.bincount(
+            flat, weights=weights, minlength=n * num_categories
+        ).reshape(n, num_categories)
+        last = np.full(n, -np.inf)
+        np.maximum.at(last, rows, event_time)
+        state['last_event'] = np.maximum(state['last_event'], last)
+
+
+def add_containers(state, containers):
+    """Append metadata and zeroed accumulators for containers not yet in the state"""
+    known = set(state['container_id'].tolist())
+    new = [c for c in containers if c[0] not in known]
+    if not new:
+        return
+    k = len(new)
+    num_categories = state['category_events'].shape[1]
+    state['container_id'] = np.concatenate([state['container_id'], np.array([c[0] for c in new], dtype=np.int64)])
+    state['customer_id'] = np.concatenate([state['customer_id'], np.array([c[1] for c in new], dtype=np.int64)])
+    state['customer_name'] = np.concatenate([state['customer_name'], np.array([c[2] for c in new], dtype=str)])
+    state['route_id'] = np.concatenate([state['route_id'], np.array([c[3] for c in new], dtype=np.int64)])
+    state['route_code'] = np.concatenate([state['route_code'], np.array([c[4] for c in new], dtype=str)])
+    for key in ('pickups', 'events', 'severity', 'score', 'scored_at'):
+        state[key] = np.concatenate([state[key], np.zeros(k)])
+    state['last_event'] = np.concatenate([state['last_event'], np.full(k, -np.inf)])
+    state['category_events'] = np.vstack([state['category_events'], np.zeros((k, num_categories))])
+    state['features'] = np.vstack([state['features'], np.zeros((k, len(FEATURES)))])
+
+
+def feature_matrix(state, rows=None):
+    """
+    Build the (containers x features) matrix from the state accumulators
+
+    Args:
+        state: Scoring state
+        rows: Optional index array restricting to a subset of containers
+
+    Returns:
+        Float array with one column per entry in FEATURES
+    """
+    sel = slice(None) if rows is None else rows
+    pickups = state['pickups'][sel]
+    events = state['events'][sel]
+    has_events = events > 0
+
+    # Smoothed event rate per pickup
+    event_rate = (events + PRIOR_PICKUPS * state['base_rate']) / (pickups + PRIOR_PICKUPS)
+    # Weighted mean severity, scaled 1-5 -> 0-1
+    severity = np.where(has_events, (state['severity'][sel] / np.maximum(events, 1e-12) - 1) / 4, 0.0)
+    # Share of events in historically severe categories
+    category = np.where(
+        has_events,
+        state['category_events'][sel] @ state['category_weight'] / np.maximum(events, 1e-12),
+        0.0
+    )
+    # Decays with time since the container's last event
+    recency = np.exp(-DECAY * (state['as_of'] - state['last_event'][sel]))
+
+    return np.column_stack([np.clip(event_rate, 0, 1), severity, category, recency])
+
+
+def score(state, rows=None):
+    """
+    Score all containers (or just rows) in one matrix-vector product
+
+    The features and time behind each score are kept with it, so containers
+    an incremental run skips still report the recency they were scored at.
+    """
+    features = feature_matrix(state, rows)
+    sel = slice(None) if rows is None else rows
+    state['score'][sel] = features @ FEATURE_WEIGHTS
+    state['features'][sel] = features
+    state['scored_at'][sel] = state['as_of']
+    return features
+
+
+def empty_state(num_categories):
+    """State with no containers"""
+    return {
+        'container_id': np.array([], dtype=np.int64),
+        'customer_id': np.array([], dtype=np.int64),
+        'customer_name': np.array([], dtype=str),
+        'route_id': np.array([], dtype=np.int64),
+        'route_code': np.array([], dtype=str),
+        'pickups': np.zeros(0),
+        'events': np.zeros(0),
+        'severity': np.zeros(0),
+        'last_event': np.zeros(0),
+        'category_events': np.zeros((0, num_categories)),
+        'score': np.zeros(0),
+        'features': np.zeros((0, len(FEATURES))),
+        'scored_at': np.zeros(0),
+    }
+
+
+def score_all_containers(days=HISTORY_DAYS):
+    """
+    Full rescore of every active container
+
+    Args:
+        days: History window in days
+
+    Returns:
+        Scoring state (dict of arrays), ready for rank_containers / save_state
+    """
+    conn = get_db_connection()
+    try:
+        containers = fetch_containers(conn)
+        activity = fetch_activity(conn, days=days)
+    finally:
+        conn.close()
+
+    now = time.time() / SECONDS_PER_DAY
+    num_categories = int(activity['event_category'].max()) + 1 if len(activity['event_category']) else 1
+
+    state = empty_state(num_categories)
+    add_containers(state, containers)
+    state['as_of'] = now
+    state['base_rate'] = len(activity['event_id']) / max(len(activity['pickup_id']), 1)
+    state['category_weight'] = category_weights(activity['event_severity'], activity['event_category'], num_categories)
+    state['last_pickup_id'] = int(activity['pickup_id'].max()) if len(activity['pickup_id']) else 0
+    state['last_contamination_id'] = int(activity['event_id'].max()) if len(activity['event_id']) else 0
+
+    accumulate(state, activity, now)
+    score(state)
+    return state
+
+
+def rescore_incremental(state):
+    """
+    Rescore only containers with pickups or events since the last run
+
+    All accumulators are first decayed to the current time by one scalar
+    factor, then only the new rows are fetched and added. Containers without
+    new activity keep their previous score.
+
+    Args:
+        state: State from a previous full or incremental run
+
+    Returns:
+        Tuple of (updated state, number of containers rescored)
+    """
+    conn = get_db_connection()
+    try:
+        activity = fetch_activity(conn, since_pickup_id=state['last_pickup_id'],
+                                  since_contamination_id=state['last_contamination_id'])
+        touched = np.union1d(activity['pickup_container'], activity['event_container'])
+        if len(touched):
+            add_containers(state, fetch_containers(conn, touched.tolist()))
+    finally:
+        conn.close()
+
+    now = time.time() / SECONDS_PER_DAY
+    factor = np.exp(-DECAY * (now - state['as_of']))
+    for key in ('pickups', 'events', 'severity', 'category_events'):
+        state[key] = state[key] * factor
+    state['as_of'] = now
+
+    accumulate(state, activity, now)
+    if len(activity['pickup_id']):
+        state['last_pickup_id'] = max(state['last_pickup_id'], int(activity['pickup_id'].max()))
+    if len(activity['event_id']):
+        state['last_contamination_id'] = max(state['last_contamination_id'], int(activity['event_id'].max()))
+
+    rows = np.flatnonzero(np.isin(state['container_id'], touched))
+    if len(rows):
+        score(state, rows)
+    return state, len(rows)
+
+
+def save_state(state, path=STATE_PATH):
+    """Persist the scoring state to a single .npz file"""
+    np.savez(path, **{key: np.asarray(value) for key, value in state.items()})
+
+
+def load_state(path=STATE_PATH):
+    """
+    Load a scoring state written by save_state
+
+    Names are stored as str arrays, so the file never needs unpickling
+    (path can come from RISK_STATE_PATH / --state).
+
+    Raises:
+        ValueError: The file holds pickled object arrays (an older state
+            file) - rerun without --incremental to rebuild it
+    """
+    with np.load(path, allow_pickle=False) as data:
+        try:
+            state = {key: data[key] for key in data.files}
+        except ValueError:
+            raise ValueError("Risk state %s holds pickled arrays - rerun without --incremental to rebuild it"
+                             % path)
+    for key in ('as_of', 'base_rate'):
+        state[key] = float(state[key])
+    for key in ('last_pickup_id', 'last_contamination_id'):
+        state[key] = int(state[key])
+    if 'features' not in state:
+        # Written before features were stored: rescore so output matches scores
+        state['features'] = np.zeros((len(state['container_id']), len(FEATURES)))
+        state['scored_at'] = np.zeros(len(state['container_id']))
+        score(state)
+    return state
+
+
+def rank_containers(state, limit=50):
+    """
+    Containers ranked by risk score, highest first
+
+    Feature fields come from the same run as each container's score.
+
+    Returns:
+        List of dicts ready for JSON output / campaign targeting
+    """
+    features = state['features']
+    order = np.argsort(-state['score'], kind='stable')[:limit]
+    top_category = np.argmax(state['category_events'], axis=1)
+    days_since_event = state['scored_at'] - state['last_event']
+
+    ranked = []
+    for i in order:
+        ranked.append({
+            'container_id': int(state['container_id'][i]),
+            'customer_id': int(state['customer_id'][i]),
+            'customer_name': str(state['customer_name'][i]),
+            'route_id': int(state['route_id'][i]),
+            'route_code': str(state['route_code'][i]),
+            'risk_score': round(float(state['score'][i]) * 100, 1),
+            'event_rate': round(float(features[i, 0]), 3),
+            'avg_severity': round(float(features[i, 1]) * 4 + 1, 2) if state['events'][i] > 0 else None,
+            'top_category_id': int(top_category[i]) if state['events'][i] > 0 else None,
+            'days_since_event': round(float(days_since_event[i]), 1) if np.isfinite(days_since_event[i]) else None,
+        })
+    return ranked
+
+
+def rank_customers(state, limit=50):
+    """
+    Customers ranked by their riskiest container
+
+    Returns:
+        List of dicts with customer_id, customer_name, route_code, risk_score, containers
+    """
+    customers, first, inverse = np.unique(state['customer_id'], return_index=True, return_inverse=True)
+    best = np.full(len(customers), -np.inf)
+    np.maximum.at(best, inverse, state['score'])
+    counts = np.bincount(inverse, minlength=len(customers))
+
+    order = np.argsort(-best, kind='stable')[:limit]
+    return [{
+        'customer_id': int(customers[i]),
+        'customer_name': str(state['customer_name'][first[i]]),
+        'route_code': str(state['route_code'][first[i]]),
+        'risk_score': round(float(best[i]) * 100, 1),
+        'containers': int(counts[i]),
+    } for i in order]
+
+
+if __name__ == '__main__':
+    """CLI interface - outputs ranked JSON for campaign targeting"""
+    parser = argparse.ArgumentParser(description="Container / customer contamination risk scores")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Rescore only containers with new pickups since the saved state")
+    parser.add_argument('--by', choices=['container', 'customer'], default='container')
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--state', default=STATE_PATH, help="Scoring state file")
+    args = parser.parse_args()
+
+    try:
+        if args.incremental and os.path.exists(args.state):
+            state, _ = rescore_incremental(load_state(args.state))
+        else:
+            state = score_all_containers()
+        save_state(state, args.state)
+
+        if args.by == 'customer':
+            ranked = rank_customers(state, args.limit)
+        else:
+            ranked = rank_containers(state, args.limit)
+        print(json.dumps(ranked, indent=2))
+    except Exception as e:
+        print(json.dumps({
+            'error': str(e),
+            'scores': []
+        }), file=sys.stderr)
+        sys.exit(1)
@@ -2,24 +2,26 @@
 """
 SARIMA-based Predictive Trends Service
 Uses Seasonal ARIMA models to predict contamination trends
+
+psycopg2, pandas and statsmodels are imported inside the functions that use
+them: the backend spawns this script per request, and importing statsmodels
+alone costs more than a second. Lite mode (--lite or ML_LITE=true) answers
+with NumPy-only models and never loads pandas or statsmodels.
+
+Each run loads its series once into a compact store (series_store.py) and
+every analysis reads views of it.
 """
 
 import sys
 import json
 import os
+import argparse
 from datetime import datetime, timedelta
+from decimal import Decimal
 import warnings
 warnings.filterwarnings('ignore')
 
-# Database connection
-import psycopg2
-from psycopg2.extras import RealDictCursor
-
-# Time series analysis
-import pandas as pd
 import numpy as np
-from statsmodels.tsa.statespace.sarimax import SARIMAX
-from statsmodels.tsa.seasonal import seasonal_decompose
 
 # Configuration
 DB_CONFIG = {
@@ -30,46 +32,48 @@ DB_CONFIG = {
     'port': os.getenv('DB_PORT', '5432')
 }
 
+# Set when the database was created from db/schema_partitioned.sql
+PARTITIONED_SCHEMA = os.getenv('DB_PARTITIONED', '').lower() in ('1', 'true', 'yes')
+
+# Default for --lite: NumPy-only forecasting, no pandas/statsmodels imports
+LITE_MODE = os.getenv('ML_LITE', '').lower() in ('1', 'true', 'yes')
+
+# Forecast resolutions: model seasonality and minimum history (in periods).
+# Weekly series skip the 52-period yearly season - fitting it costs more
+# than the daily model it replaces. Monthly needs two full years plus a
+# margin: the seasonal difference alone uses up 12 points, and shorter
+# windows fall back to the daily model.
+RESOLUTIONS = {
+    'daily': {'seasonal_period': 7, 'min_points': 14},
+    'weekly': {'seasonal_period': 0, 'min_points': 8},
+    'monthly': {'seasonal_period': 12, 'min_points': 30},
+}
+
+# Confidence levels of the forecast intervals. lower_bound / upper_bound
+# are the first level; with several, 'intervals' holds all of them.
+INTERVAL_LEVELS = (0.95,)
+
 def get_db_connection():
     """Get database connection"""
+    import psycopg2
     return psycopg2.connect(**DB_CONFIG)
 
-def fetch_time_series_data(route_id=None, days=365):
+def get_dict_cursor(conn):
+    """Cursor returning rows as dicts"""
+    from psycopg2.extras import RealDictCursor
+    return conn.cursor(cursor_factory=RealDictCursor)
+
+def event_window_clause(days):
     """
-    Fetch contamination time series data from database
-    
-    Args:
-        route_id: Optional route ID to filter by
-        days: Number of days of historical data to fetch
-    
-    Returns:
-        DataFrame with date and contamination_count columns
+    Extra contamination_events predicate for time-windowed queries
+
+    With the partitioned schema, events carry their pickup's pickup_time, so
+    repeating the window on them lets the BRIN index bound the events scan
+    the same way partition pruning bounds pickups. Empty for the base schema.
     """
-    conn = get_db_connection()
-    try:
-        query = """
-            SELECT 
-                DATE_TRUNC('day', p.pickup_time) as date,
-                COUNT(ce.contamination_id) as contamination_count,
-                AVG(ce.severity) as avg_severity,
-                AVG(ce.estimated_contamination_pct) as avg_contamination_pct
-            FROM pickups p
-            LEFT JOIN contamination_events ce ON p.pickup_id = ce.pickup_id
-            WHERE p.pickup_time >= CURRENT_DATE - INTERVAL '%s days'
-        """ % days
-        
-        if route_id:
-            query += " AND p.route_id = %s" % route_id
-        
-        query += """
-            GROUP BY DATE_TRUNC('day', p.pickup_time)
-            ORDER BY date
-        """
-        
-        df = pd.read_sql(query, conn, parse_dates=['date'])
-        return df
-    finally:
-        conn.close()
+    if not PARTITIONED_SCHEMA:
+        return ""
+    return " AND ce.pickup_time >= CURRENT_DATE - INTERVAL '%s days'" % days
 
 def fit_sarima_model(ts, seasonal_period=7):
     """
@@ -77,11 +81,14 @@ def fit_sarima_model(ts, seasonal_period=7):
     
     Args:
         ts: Time series data (pandas Series)
-        seasonal_period: Seasonal period (7 for weekly, 365 for yearly)
+        seasonal_period: Seasonal period (7 for weekly, 365 for yearly,
+            0 for a non-seasonal ARIMA)
     
     Returns:
         Fitted SARIMAX model
     """
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+    
     # Auto-select best parameters using AIC
     best_aic = np.inf
     best_order = None
@@ -95,6 +102,8 @@ def fit_sarima_model(ts, seasonal_period=7):
         ((0, 1, 1), (0, 1, 1, seasonal_period)),
         ((1, 0, 1), (1, 0, 1, seasonal_period)),
     ]
+    if seasonal_period < 2:
+        param_grid = [(order, (0, 0, 0, 0)) for order, _ in param_grid]
     
     for order, seasonal_order in param_grid:
         try:
@@ -118,7 +127,7 @@ def fit_sarima_model(ts, seasonal_period=7):
     if best_order is None:
         # Fallback to simple ARIMA
         best_order = (1, 1, 1)
-        best_seasonal_order = (0, 0, 0, seasonal_period)
+        best_seasonal_order = (0, 0, 0, seasonal_period if seasonal_period >= 2 else 0)
     
     final_model = SARIMAX(
         ts,
@@ -130,18 +139,110 @@ def fit_sarima_model(ts, seasonal_period=7):
     
     return final_model.fit(disp=False)
 
-def predict_future_trends(ts, forecast_days=30):
+def interval_z(interval_levels):
+    """Two-sided normal quantile per confidence level (0.95 -> 1.96)"""
+    from statistics import NormalDist
+    return np.array([NormalDist().inv_cdf(0.5 + level / 2) for level in interval_levels])
+
+def interval_bounds(forecast, scale, interval_levels=INTERVAL_LEVELS):
     """
-    Predict future contamination trends using SARIMA
+    Lower and upper bounds for every confidence level in one pass
     
     Args:
-        ts: Time series data
+        forecast: (... x horizon) forecast array
+        scale: Forecast standard error, broadcastable to forecast
+        interval_levels: Confidence levels, e.g. (0.8, 0.95)
+    
+    Returns:
+        Tuple of (levels x ... x horizon) lower and upper bound arrays
+    """
+    z = interval_z(interval_levels).reshape((-1,) + (1,) * np.ndim(forecast))
+    width = z * scale
+    return forecast - width, forecast + width
+
+def horizon_scale(forecast_days, seasonal_period=7):
+    """Interval widening with distance from the last observation (lite models)"""
+    return np.sqrt(1.0 + np.arange(1, forecast_days + 1) / max(seasonal_period, 1))
+
+def with_intervals(result, lower, upper, interval_levels=INTERVAL_LEVELS):
+    """Add every level's bounds under 'intervals', keyed by percent ('80', '95'), when there are several"""
+    if len(interval_levels) > 1:
+        result['intervals'] = {
+            f"{level * 100:g}": {'lower_bound': lower[i], 'upper_bound': upper[i]}
+            for i, level in enumerate(interval_levels)
+        }
+    return result
+
+def forecast_result(forecast, lower, upper, recent_avg, interval_levels=INTERVAL_LEVELS):
+    """
+    Forecast dict shared by the models
+    
+    Values stay NumPy arrays; json_default turns them into lists when a
+    record is written out.
+    
+    Args:
+        forecast: (horizon,) forecast array
+        lower: (levels x horizon) lower bounds
+        upper: (levels x horizon) upper bounds
+        recent_avg: Mean of the last 7 observed values
+        interval_levels: Confidence level of each bounds row
+    """
+    return with_intervals({
+        'forecast': forecast,
+        'lower_bound': lower[0],
+        'upper_bound': upper[0],
+        'trend': 'increasing' if forecast[-1] > recent_avg else 'decreasing',
+        'expected_change': float((forecast[-1] - recent_avg) / max(recent_avg, 1) * 100)
+    }, lower, upper, interval_levels)
+
+def simple_trend_forecast(values, forecast_days=30, interval_levels=INTERVAL_LEVELS):
+    """
+    Flat forecast from the last week's average (fallback when a model can't be fit)
+    
+    Args:
+        values: Daily values as a NumPy array (no NaNs)
         forecast_days: Number of days to forecast ahead
+        interval_levels: Confidence levels (all get the same +/-20% band)
     
     Returns:
         Dictionary with predictions and confidence intervals
     """
-    if len(ts) < 14:  # Need at least 2 weeks of data
+    recent_avg = values[-7:].mean()
+    older_avg = values[-14:-7].mean() if len(values) >= 14 else recent_avg
+    
+    if older_avg > 0:
+        change_pct = (recent_avg - older_avg) / older_avg * 100
+        trend = 'increasing' if change_pct > 10 else 'decreasing' if change_pct < -10 else 'stable'
+    else:
+        change_pct = 0
+        trend = 'stable'
+    
+    lower = np.full((len(interval_levels), forecast_days), recent_avg * 0.8)
+    upper = np.full((len(interval_levels), forecast_days), recent_avg * 1.2)
+    return with_intervals({
+        'forecast': np.full(forecast_days, recent_avg),
+        'lower_bound': lower[0],
+        'upper_bound': upper[0],
+        'trend': trend,
+        'expected_change': change_pct
+    }, lower, upper, interval_levels)
+
+def predict_future_trends(ts, forecast_days=30, seasonal_period=7, min_points=14,
+                          interval_levels=INTERVAL_LEVELS):
+    """
+    Predict future contamination trends using SARIMA
+    
+    Args:
+        ts: Time series data
+        forecast_days: Number of days (or periods, for resampled series) to forecast ahead
+        seasonal_period: Seasonal period of ts (7 = weekly seasonality on daily data)
+        min_points: Minimum series length to attempt a forecast
+        interval_levels: Confidence levels of the intervals
+    
+    Returns:
+        Dictionary with predictions and confidence intervals (NumPy arrays)
+    """
+    if len(ts) < min_points:  # Need at least 2 weeks of data
         return None
     
     # Fill missing dates with 0
@@ -149,193 +250,762 @@ def predict_future_trends(ts, forecast_days=30):
     
     # Fit model
     try:
-        model = fit_sarima_model(ts, seasonal_period=7)  # Weekly seasonality
+        model = fit_sarima_model(ts, seasonal_period=seasonal_period)
         
-        # Forecast
-        forecast = model.forecast(steps=forecast_days)
-        forecast_ci = model.get_forecast(steps=forecast_days).conf_int()
+        # One forecast pass: the mean and its standard error give every level's interval
+        prediction = model.get_forecast(steps=forecast_days)
+        forecast = np.asarray(prediction.predicted_mean, dtype=float)
+        se_mean = np.asarray(prediction.se_mean, dtype=float)
+        if not (np.isfinite(forecast).all() and np.isfinite(se_mean).all()):
+            # Too few points past differencing: the fit "succeeds" with NaNs
+            return simple_trend_forecast(ts.to_numpy(dtype=float), forecast_days, interval_levels)
+        lower, upper = interval_bounds(forecast, se_mean, interval_levels)
         
-        return {
-            'forecast': forecast.tolist(),
-            'lower_bound': forecast_ci.iloc[:, 0].tolist(),
-            'upper_bound': forecast_ci.iloc[:, 1].tolist(),
-            'trend': 'increasing' if forecast.iloc[-1] > ts.iloc[-7:].mean() else 'decreasing',
-            'expected_change': float((forecast.iloc[-1] - ts.iloc[-7:].mean()) / max(ts.iloc[-7:].mean(), 1) * 100)
-        }
+        return forecast_result(forecast, lower, upper, ts.to_numpy(dtype=float)[-7:].mean(), interval_levels)
     except Exception as e:
         # Fallback to simple trend analysis
-        recent_avg = ts.iloc[-7:].mean()
-        older_avg = ts.iloc[-14:-7].mean() if len(ts) >= 14 else recent_avg
-        
-        if older_avg > 0:
-            change_pct = (recent_avg - older_avg) / older_avg * 100
-            trend = 'increasing' if change_pct > 10 else 'decreasing' if change_pct < -10 else 'stable'
-        else:
-            change_pct = 0
-            trend = 'stable'
-        
-        return {
-            'forecast': [recent_avg] * forecast_days,
-            'lower_bound': [recent_avg * 0.8] * forecast_days,
-            'upper_bound': [recent_avg * 1.2] * forecast_days,
-            'trend': trend,
-            'expected_change': change_pct
-        }
+        return simple_trend_forecast(ts.to_numpy(dtype=float), forecast_days, interval_levels)
 
-def analyze_route_trends():
-    """Analyze trends for all routes and generate predictions"""
-    conn = get_db_connection()
+def predict_future_trends_lite(values, forecast_days=30, seasonal_period=7, min_points=14,
+                               interval_levels=INTERVAL_LEVELS):
+    """
+    Predict future contamination trends with a NumPy-only model
+    
+    Linear trend plus an average weekly profile of the detrended series,
+    fit by least squares. Much cheaper than SARIMA and needs no statsmodels.
+    
+    Args:
+        values: Daily values (array-like, NaN treated as 0)
+        forecast_days: Number of days (or periods, for resampled series) to forecast ahead
+        seasonal_period: Seasonal period (7 for weekly, 0 for none)
+        min_points: Minimum series length to attempt a forecast
+        interval_levels: Confidence levels of the intervals
+    
+    Returns:
+        Dictionary with predictions and confidence intervals (NumPy arrays)
+    """
+    y = np.nan_to_num(np.asarray(values, dtype=float))
+    n = len(y)
+    if n < min_points:  # Need at least 2 weeks of data
+        return None
+    seasonal_period = max(seasonal_period, 1)
+    
     try:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Get all routes
-        cursor.execute("SELECT route_id, route_code FROM routes WHERE active = TRUE")
-        routes = cursor.fetchall()
+        t = np.arange(n)
+        slope, intercept = np.polyfit(t, y, 1)
+        detrended = y - (slope * t + intercept)
         
-        predictions = []
+        # Mean detrended value at each position of the seasonal cycle
+        phase = t % seasonal_period
+        season = (np.bincount(phase, weights=detrended, minlength=seasonal_period)
+                  / np.maximum(np.bincount(phase, minlength=seasonal_period), 1))
+        residual_std = np.std(detrended - season[phase])
         
-        for route in routes:
-            route_id = route['route_id']
-            route_code = route['route_code']
-            
-            # Fetch time series data
-            df = fetch_time_series_data(route_id=route_id, days=365)
-            
-            if len(df) < 14:
-                continue
-            
-            # Create time series
-            df = df.set_index('date')
-            ts = df['contamination_count']
-            
-            # Predict future trends
-            forecast = predict_future_trends(ts, forecast_days=30)
-            
-            if forecast:
-                # Calculate current stats
-                recent_events = int(ts.iloc[-7:].sum())
-                avg_severity = float(df.iloc[-7:]['avg_severity'].mean()) if 'avg_severity' in df.columns else 0
-                
-                predictions.append({
-                    'route_id': route_id,
-                    'route_code': route_code,
-                    'trend': forecast['trend'],
-                    'expected_change_pct': forecast['expected_change'],
-                    'recent_events': recent_events,
-                    'avg_severity': avg_severity,
-                    'forecast_next_week': int(forecast['forecast'][7]) if len(forecast['forecast']) > 7 else recent_events
-                })
+        h = np.arange(n, n + forecast_days)
+        forecast = slope * h + intercept + season[h % seasonal_period]
+        # Intervals widen with distance from the last observation
+        lower, upper = interval_bounds(forecast, residual_std * horizon_scale(forecast_days, seasonal_period),
+                                       interval_levels)
         
-        return predictions
-    finally:
-        conn.close()
+        return forecast_result(forecast, lower, upper, y[-7:].mean(), interval_levels)
+    except Exception as e:
+        return simple_trend_forecast(y, forecast_days, interval_levels)
 
-def generate_predictive_searches():
+def predict_future_trends_lite_batch(Y, forecast_days=30, seasonal_period=7):
     """
-    Generate predictive search suggestions using SARIMA models
-    Returns JSON compatible with TypeScript PredictiveSearch interface
+    Fit the lite model (linear trend + average seasonal profile) to every row
+    of a series x days matrix at once
+
+    Same model as predict_future_trends_lite, solved in closed form for all
+    rows together instead of one polyfit per series.
+
+    Args:
+        Y: (series x days) array of daily values (NaN treated as 0)
+        forecast_days: Number of days to forecast ahead
+        seasonal_period: Seasonal period (7 for weekly, 0 for none)
+
+    Returns:
+        Tuple of ((series x forecast_days) forecast array, residual variance
+        per series)
+    """
+    Y = np.nan_to_num(np.asarray(Y, dtype=float))
+    rows, n = Y.shape
+    seasonal_period = max(seasonal_period, 1)
+
+    t = np.arange(n)
+    t_centered = t - t.mean()
+    means = Y.mean(axis=1)
+    slope = (Y @ t_centered) / max((t_centered ** 2).sum(), 1e-12)
+    intercept = means - slope * t.mean()
+    detrended = Y - (slope[:, None] * t + intercept[:, None])
+
+    # Mean detrended value at each position of the seasonal cycle, per row
+    phase = t % seasonal_period
+    flat = (np.arange(rows)[:, None] * seasonal_period + phase).ravel()
+    sums = np.bincount(flat, weights=detrended.ravel(), minlength=rows * seasonal_period)
+    season = sums.reshape(rows, seasonal_period) / np.maximum(np.bincount(phase, minlength=seasonal_period), 1)
+    residual_var = (detrended - season[:, phase]).var(axis=1)
+
+    h = np.arange(n, n + forecast_days)
+    forecast = slope[:, None] * h + intercept[:, None] + season[:, h % seasonal_period]
+    return forecast, residual_var
+
+def forecast_batch(dates, Y, forecast_days=30, lite=LITE_MODE, resolution='daily',
+                   interval_levels=INTERVAL_LEVELS):
+    """
+    Forecast every row of a series x days matrix into preallocated arrays
+    
+    Daily lite forecasts are solved for all rows at once
+    (predict_future_trends_lite_batch); other models are fit row by row.
+    No per-series lists either way.
+    
+    Args:
+        dates: Sequence of dates, one per column
+        Y: (series x days) array of daily values
+        forecast_days: Number of days to forecast ahead
+        lite: Use the NumPy-only model instead of SARIMA
+        resolution: 'daily', 'weekly' or 'monthly'
+        interval_levels: Confidence levels of the intervals
+    
+    Returns:
+        Dict with (series x forecast_days) forecast, (levels x series x
+        forecast_days) lower_bound / upper_bound, and per-series trend,
+        expected_change and ok (False where there was too little history)
+    """
+    Y = np.asarray(Y)
+    rows = Y.shape[0]
+    batch = {
+        'forecast': np.zeros((rows, forecast_days)),
+        'lower_bound': np.zeros((len(interval_levels), rows, forecast_days)),
+        'upper_bound': np.zeros((len(interval_levels), rows, forecast_days)),
+        'trend': np.full(rows, 'decreasing', dtype='<U10'),
+        'expected_change': np.zeros(rows),
+        'ok': np.zeros(rows, dtype=bool),
+    }
+    
+    if lite and resolution == 'daily':
+        if rows and Y.shape[1] >= RESOLUTIONS['daily']['min_points']:
+            forecast, residual_var = predict_future_trends_lite_batch(Y, forecast_days)
+            scale = np.sqrt(residual_var)[:, None] * horizon_scale(forecast_days)
+            batch['forecast'] = forecast
+            batch['lower_bound'], batch['upper_bound'] = interval_bounds(forecast, scale, interval_levels)
+            recent_avg = np.nan_to_num(Y[:, -7:].astype(float)).mean(axis=1)
+            batch['trend'][forecast[:, -1] > recent_avg] = 'increasing'
+            batch['expected_change'] = (forecast[:, -1] - recent_avg) / np.maximum(recent_avg, 1) * 100
+            batch['ok'][:] = True
+        return batch
+    
+    for i, result in iter_forecasts(dates, Y, forecast_days, lite, resolution, interval_levels):
+        bounds = list(result['intervals'].values()) if 'intervals' in result else [result]
+        batch['forecast'][i] = result['forecast']
+        batch['lower_bound'][:, i] = [b['lower_bound'] for b in bounds]
+        batch['upper_bound'][:, i] = [b['upper_bound'] for b in bounds]
+        batch['trend'][i] = result['trend']
+        batch['expected_change'][i] = result['expected_change']
+        batch['ok'][i] = True
+    return batch
+
+def batch_forecast(batch, i, interval_levels=INTERVAL_LEVELS):
+    """Forecast dict for row i of a forecast_batch result, as views into its arrays"""
+    return with_intervals({
+        'forecast': batch['forecast'][i],
+        'lower_bound': batch['lower_bound'][0, i],
+        'upper_bound': batch['upper_bound'][0, i],
+        'trend': str(batch['trend'][i]),
+        'expected_change': float(batch['expected_change'][i])
+    }, batch['lower_bound'][:, i], batch['upper_bound'][:, i], interval_levels)
+
+def iter_forecasts(dates, Y, forecast_days=30, lite=LITE_MODE, resolution='daily',
+                   interval_levels=INTERVAL_LEVELS):
+    """
+    Yield (row, forecast dict) for each row of a series x days matrix that can be forecast
+    
+    Daily lite forecasts come from one forecast_batch pass; other models
+    are fit row by row and yielded as each finishes.
+    
+    Args:
+        dates: Sequence of dates, one per column
+        Y: (series x days) array of daily values
+        forecast_days: Number of days to forecast ahead
+        lite: Use the NumPy-only model instead of SARIMA
+        resolution: 'daily', 'weekly' or 'monthly'
+        interval_levels: Confidence levels of the intervals
+    """
+    if lite and resolution == 'daily':
+        batch = forecast_batch(dates, Y, forecast_days, lite, resolution, interval_levels)
+        for i in np.flatnonzero(batch['ok']):
+            yield int(i), batch_forecast(batch, i, interval_levels)
+        return
+    
+    for i in range(len(Y)):
+        result = forecast_series(dates, Y[i], forecast_days, lite=lite, resolution=resolution,
+                                 interval_levels=interval_levels)
+        if result is not None:
+            yield i, result
+
+def aggregate_series(dates, values, resolution='weekly'):
+    """
+    Sum a daily series into weekly (Monday-start) or monthly periods
+    
+    Days missing from the input count as 0. Partial periods at either end
+    (the history window rarely starts on a Monday, and the current week or
+    month is still in progress) are dropped so they don't read as dips.
+    
+    Args:
+        dates: Sequence of dates/datetimes, one per value, ascending
+        values: Daily values (NaN treated as 0)
+        resolution: 'weekly' or 'monthly'
+    
+    Returns:
+        Tuple of (period start dates as datetime64[D] array, period totals array)
     """
-    searches = []
+    days = np.array(dates, dtype='datetime64[D]')
+    y = np.nan_to_num(np.asarray(values, dtype=float))
     
-    # Analyze category trends
+    if resolution == 'weekly':
+        # 1970-01-05 was a Monday
+        monday = np.datetime64('1970-01-05', 'D')
+        to_period = lambda d: (d - monday).astype(np.int64) // 7
+        to_start = lambda p: monday + p * 7
+    elif resolution == 'monthly':
+        to_period = lambda d: d.astype('datetime64[M]').astype(np.int64)
+        to_start = lambda p: p.astype('datetime64[M]').astype('datetime64[D]')
+    else:
+        raise ValueError("resolution must be 'weekly' or 'monthly', got %r" % resolution)
+    
+    if len(days) == 0:
+        return np.array([], dtype='datetime64[D]'), np.array([], dtype=float)
+    
+    periods = to_period(days)
+    first, last = periods[0], periods[-1]
+    totals = np.bincount(periods - first, weights=y, minlength=last - first + 1)
+    starts = to_start(np.arange(first, last + 1))
+    
+    # Trim periods not fully covered by the input window
+    lo = 1 if to_period(days[0] - 1) == first else 0
+    hi = len(totals) - 1 if to_period(days[-1] + 1) == last else len(totals)
+    return starts[lo:hi], totals[lo:hi]
+
+def period_ends(starts, resolution):
+    """Day after the end of each weekly / monthly period"""
+    if resolution == 'weekly':
+        return starts + 7
+    return (starts.astype('datetime64[M]') + 1).astype('datetime64[D]')
+
+def disaggregate_forecast(result, resolution, first_day, forecast_days):
+    """
+    Spread a per-period forecast evenly back over days
+    
+    The first forecast period is usually the current, partly observed one,
+    so daily values start at first_day rather than at the period start.
+    
+    Args:
+        result: Forecast dict from forecast_at_resolution (with period_starts)
+        resolution: Resolution the forecast was made at
+        first_day: Date of the first daily value (the day after the last observation)
+        forecast_days: Number of daily values to produce
+    
+    Returns:
+        Forecast dict with daily forecast / lower_bound / upper_bound arrays
+    """
+    starts = np.array(result['period_starts'], dtype='datetime64[D]')
+    days_in_period = (period_ends(starts, resolution) - starts).astype(np.int64)
+    days = np.datetime64(first_day, 'D') + np.arange(forecast_days)
+    period_index = np.searchsorted(starts, days, side='right') - 1
+    spread = lambda period_values: (np.asarray(period_values, dtype=float)[period_index]
+                                    / days_in_period[period_index])
+    daily = dict(result)
+    for key in ('forecast', 'lower_bound', 'upper_bound'):
+        daily[key] = spread(result[key])
+    if 'intervals' in result:
+        daily['intervals'] = {label: {key: spread(values) for key, values in bounds.items()}
+                              for label, bounds in result['intervals'].items()}
+    return daily
+
+def forecast_at_resolution(dates, values, forecast_days=90, resolution='weekly',
+                           lite=LITE_MODE, as_daily=False, interval_levels=INTERVAL_LEVELS):
+    """
+    Forecast a daily series at weekly or monthly resolution
+    
+    The series is aggregated in one vectorized pass and the model is fit on
+    the much shorter period series (52 points/year weekly, 12 monthly), which
+    makes 30-90+ day horizons a fraction of the cost of a daily SARIMA.
+    
+    Args:
+        dates: Sequence of dates, one per daily value
+        values: Daily values
+        forecast_days: Horizon in days
+        resolution: 'weekly' or 'monthly'
+        lite: Use the NumPy-only model instead of SARIMA
+        as_daily: Spread the result back to forecast_days daily values
+        interval_levels: Confidence levels of the intervals
+    
+    Returns:
+        Forecast dict (per period unless as_daily) with 'resolution' and
+        'period_starts' of the forecast periods, or None if too little history
+    """
+    config = RESOLUTIONS[resolution]
+    starts, totals = aggregate_series(dates, values, resolution)
+    if len(starts) == 0:
+        return None
+    
+    # Forecast periods run from the one after the last full period (usually
+    # the current, partial one) through the period holding the last forecast day
+    first_day = np.datetime64(dates[-1], 'D') + 1
+    last_day = first_day + forecast_days - 1
+    next_start = period_ends(starts[-1:], resolution)[0]
+    if resolution == 'weekly':
+        steps = int((last_day - next_start).astype(np.int64) // 7) + 1
+    else:
+        steps = int((last_day.astype('datetime64[M]') - next_start.astype('datetime64[M]')).astype(np.int64)) + 1
+    
+    if lite:
+        result = predict_future_trends_lite(totals, forecast_days=steps,
+                                            seasonal_period=config['seasonal_period'],
+                                            min_points=config['min_points'],
+                                            interval_levels=interval_levels)
+    else:
+        import pandas as pd
+        result = predict_future_trends(pd.Series(totals), forecast_days=steps,
+                                       seasonal_period=config['seasonal_period'],
+                                       min_points=config['min_points'],
+                                       interval_levels=interval_levels)
+    if result is None:
+        return None
+    
+    if resolution == 'weekly':
+        next_starts = starts[-1] + 7 * np.arange(1, steps + 1)
+    else:
+        next_starts = (starts[-1].astype('datetime64[M]') + np.arange(1, steps + 1)).astype('datetime64[D]')
+    result['resolution'] = resolution
+    result['period_starts'] = [str(d) for d in next_starts]
+    
+    if as_daily:
+        result = disaggregate_forecast(result, resolution, first_day, forecast_days)
+    return result
+
+def forecast_series(dates, values, forecast_days=30, lite=LITE_MODE, resolution='daily',
+                    interval_levels=INTERVAL_LEVELS):
+    """
+    Daily-shaped forecast of a daily series at the requested model resolution
+    
+    Falls back to the daily model when the window holds too few full weeks
+    or months (e.g. 90 days is at most 2 full months); the result then has
+    no 'resolution' key.
+    
+    Args:
+        dates: Sequence of dates, one per value
+        values: Daily values (array-like, e.g. a series store view)
+        forecast_days: Number of days to forecast ahead
+        lite: Use the NumPy-only model instead of SARIMA
+        resolution: 'daily', 'weekly' or 'monthly'
+        interval_levels: Confidence levels of the intervals
+    
+    Returns:
+        Dictionary with daily predictions and confidence intervals, or None
+    """
+    if resolution != 'daily':
+        result = forecast_at_resolution(dates, values, forecast_days, resolution,
+                                        lite=lite, as_daily=True, interval_levels=interval_levels)
+        if result is not None:
+            return result
+    if lite:
+        return predict_future_trends_lite(values, forecast_days=forecast_days, interval_levels=interval_levels)
+    
+    import pandas as pd
+    # Store views cover every calendar day, so the index has a daily frequency
+    index = pd.DatetimeIndex(np.asarray(dates, dtype='datetime64[D]'), freq='D')
+    ts = pd.Series(np.asarray(values, dtype=float), index=index)
+    return predict_future_trends(ts, forecast_days=forecast_days, interval_levels=interval_levels)
+
+def run_store(store=None):
+    """Series store shared by one run's analyses (see series_store.py); loaded if not given"""
+    if store is None:
+        from series_store import get_series_store
+        store = get_series_store()
+    return store
+
+def fetch_routes(route_ids=None):
+    """Active routes as dicts with route_id and route_code, optionally filtered"""
     conn = get_db_connection()
     try:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Get top contamination categories
-        cursor.execute("""
-            SELECT 
-                cc.category_id,
-                cc.code,
-                cc.description,
-                COUNT(ce.contamination_id) as count,
-                AVG(ce.severity) as avg_severity
-            FROM contamination_events ce
-            INNER JOIN contamination_categories cc ON ce.category_id = cc.category_id
-            INNER JOIN pickups p ON ce.pickup_id = p.pickup_id
-            WHERE p.pickup_time >= CURRENT_DATE - INTERVAL '30 days'
-            GROUP BY cc.category_id, cc.code, cc.description
-            ORDER BY count DESC
-            LIMIT 1
-        """)
-        
-        top_category = cursor.fetchone()
-        if top_category:
-            searches.append({
-                'title': f"Focus on {top_category['description']}",
-                'description': f"{top_category['count']} events in the last 30 days",
-                'queryType': 'category',
-                'queryParams': {'categoryId': top_category['category_id']},
-                'confidence': 0.85,
-                'insight': f"{top_category['description']} is the most common contamination type. Analysis suggests this pattern will continue without intervention. Click here to generate an email to inform the customer about the contamination type."
-            })
-        
-        # Find high severity routes
-        cursor.execute("""
-            SELECT 
-                r.route_id,
-                r.route_code,
-                COUNT(ce.contamination_id) as event_count,
-                AVG(ce.severity) as avg_severity
-            FROM contamination_events ce
-            INNER JOIN pickups p ON ce.pickup_id = p.pickup_id
-            INNER JOIN routes r ON p.route_id = r.route_id
-            WHERE p.pickup_time >= CURRENT_DATE - INTERVAL '30 days'
-            GROUP BY r.route_id, r.route_code
-            HAVING AVG(ce.severity) >= 4.0
-            ORDER BY avg_severity DESC
-            LIMIT 1
-        """)
+        cursor = get_dict_cursor(conn)
+        query = "SELECT route_id, route_code FROM routes WHERE active = TRUE"
+        params = None
+        if route_ids:
+            query += " AND route_id = ANY(%s)"
+            params = (list(route_ids),)
+        cursor.execute(query + " ORDER BY route_id", params)
+        return cursor.fetchall()
+    finally:
+        conn.close()
+
+def iter_route_trends(lite=LITE_MODE, resolution='daily', hierarchical=None, store=None):
+    """
+    Yield a trend prediction per route as soon as its model is fit
+    
+    Args:
+        lite: Use NumPy-only forecasting (no pandas/statsmodels)
+        resolution: Model resolution ('daily', 'weekly' or 'monthly')
+        hierarchical: Reconciliation method to take routes from one coherent
+            hierarchy forecast (see hierarchy.py); None fits each route alone
+        store: Series store for this run (loaded if not given)
+    """
+    from series_store import window, take_rows, mean_severity
+    store = run_store(store)
+    
+    if hierarchical:
+        from hierarchy import iter_hierarchy_forecasts
+        for node in iter_hierarchy_forecasts(days=365, forecast_days=30, method=hierarchical,
+                                             levels=['route'], store=store, lite=lite, resolution=resolution):
+            yield {
+                'route_id': node['route_id'],
+                'route_code': node['route_code'],
+                'trend': node['trend'],
+                'expected_change_pct': node['expected_change'],
+                'recent_events': node['recent_events'],
+                'avg_severity': node['avg_severity'],
+                'forecast_next_week': int(node['forecast'][7])
+            }
+        return
+    
+    dates = window(store['dates'], 365)
+    if len(dates) < 14:
+        return
+    rows = np.flatnonzero(store['route_active'])
+    events = take_rows(window(store['route_events'], 365), rows)
+    
+    # Predict future trends (daily lite: all routes in one pass)
+    for i, forecast in iter_forecasts(dates, events, forecast_days=30, lite=lite, resolution=resolution):
+        row = rows[i]
+        severity = window(store['route_severity'][row], 365)
         
-        high_severity = cursor.fetchone()
-        if high_severity:
-            searches.append({
-                'title': f"High Severity Alert - Route {high_severity['route_code']}",
-                'description': f"Average severity: {high_severity['avg_severity']:.1f}/5",
-                'queryType': 'severity',
-                'queryParams': {'routeId': high_severity['route_id'], 'minSeverity': 4},
-                'confidence': 0.9,
-                'insight': f"Route {high_severity['route_code']} has consistently high severity contamination (avg {high_severity['avg_severity']:.1f}/5). Analysis suggests immediate action is needed."
-            })
+        # Calculate current stats
+        recent_events = int(events[i, -7:].sum())
         
-        # Overall trend prediction
-        overall_df = fetch_time_series_data(days=90)
-        if len(overall_df) >= 14:
-            overall_df = overall_df.set_index('date')
-            overall_ts = overall_df['contamination_count']
-            overall_forecast = predict_future_trends(overall_ts, forecast_days=14)
-            
-            if overall_forecast and overall_forecast['trend'] == 'increasing':
-                searches.append({
-                    'title': 'Overall Contamination Trend Alert',
-                    'description': f"Analysis predicts {overall_forecast['expected_change']:.1f}% increase in next 2 weeks",
-                    'queryType': 'trend',
-                    'queryParams': {
-                        'startDate': datetime.now().isoformat(),
-                        'endDate': (datetime.now() + timedelta(days=14)).isoformat()
-                    },
-                    'confidence': min(0.9, 0.7 + abs(overall_forecast['expected_change']) / 200),
-                    'insight': f"Analysis forecasts increasing contamination system-wide. Expected {int(overall_forecast['forecast'][13])} events in 2 weeks (current: {int(overall_ts.iloc[-7:].mean())} per day). Create a new campaign generated from this analysis here."
-                })
+        yield {
+            'route_id': int(store['route_id'][row]),
+            'route_code': str(store['route_code'][row]),
+            'trend': forecast['trend'],
+            'expected_change_pct': forecast['expected_change'],
+            'recent_events': recent_events,
+            'avg_severity': mean_severity(events[i, -7:], severity[-7:]),
+            'forecast_next_week': int(forecast['forecast'][7]) if len(forecast['forecast']) > 7 else recent_events
+        }
+
+def analyze_route_trends(lite=LITE_MODE, resolution='daily', hierarchical=None, store=None):
+    """
+    Analyze trends for all routes and generate predictions
     
-    finally:
-        conn.close()
+    Args:
+        lite: Use NumPy-only forecasting (no pandas/statsmodels)
+        resolution: Model resolution ('daily', 'weekly' or 'monthly')
+        hierarchical: Reconciliation method, or None for independent fits
+        store: Series store for this run (loaded if not given)
+    """
+    return list(iter_route_trends(lite=lite, resolution=resolution, hierarchical=hierarchical, store=store))
+
+def iter_route_forecasts(route_ids, days=365, forecast_days=30, lite=LITE_MODE, resolution='daily',
+                         hierarchical=None, store=None, interval_levels=INTERVAL_LEVELS):
+    """
+    Yield the full forecast (values and confidence bounds) for each route
+    
+    Args:
+        route_ids: Route IDs to forecast
+        days: Number of days of history to fit on
+        forecast_days: Number of days to forecast ahead
+        lite: Use NumPy-only forecasting (no pandas/statsmodels)
+        resolution: Model resolution ('daily', 'weekly' or 'monthly')
+        hierarchical: Reconciliation method, or None for independent fits
+        store: Series store for this run (loaded if not given)
+        interval_levels: Confidence levels of the intervals
+    """
+    from series_store import window, take_rows
+    store = run_store(store)
+    
+    if hierarchical:
+        from hierarchy import iter_hierarchy_forecasts
+        for node in iter_hierarchy_forecasts(days=days, forecast_days=forecast_days, method=hierarchical,
+                                             levels=['route'], store=store, interval_levels=interval_levels,
+                                             lite=lite, resolution=resolution):
+            if node['route_id'] in route_ids:
+                keys = ['forecast', 'lower_bound', 'upper_bound', 'intervals', 'trend', 'expected_change']
+                yield dict(route_id=node['route_id'], route_code=node['route_code'], resolution='daily',
+                           **{key: node[key] for key in keys if key in node})
+        return
+    
+    dates = window(store['dates'], days)
+    rows = np.flatnonzero(store['route_active'] & np.isin(store['route_id'], list(route_ids)))
+    events = take_rows(window(store['route_events'], days), rows)
+    for i, forecast in iter_forecasts(dates, events, forecast_days=forecast_days, lite=lite,
+                                      resolution=resolution, interval_levels=interval_levels):
+        row = rows[i]
+        # Coarse resolutions set 'resolution' themselves (absent on the daily fallback)
+        yield dict(forecast, route_id=int(store['route_id'][row]), route_code=str(store['route_code'][row]),
+                   resolution=forecast.get('resolution', 'daily'))
+
+def iter_category_trends(days=365, forecast_days=30, lite=LITE_MODE, resolution='daily', hierarchical=None,
+                         store=None):
+    """
+    Yield a trend prediction per contamination category
+    
+    Categories with no events in the window are skipped.
+    
+    Args:
+        days: Number of days of history to fit on
+        forecast_days: Number of days to forecast ahead
+        lite: Use NumPy-only forecasting (no pandas/statsmodels)
+        resolution: Model resolution ('daily', 'weekly' or 'monthly')
+        hierarchical: Reconciliation method, or None for independent fits
+        store: Series store for this run (loaded if not given)
+    """
+    from series_store import window, take_rows
+    store = run_store(store)
+    
+    if hierarchical:
+        from hierarchy import iter_hierarchy_forecasts
+        for node in iter_hierarchy_forecasts(days=days, forecast_days=forecast_days, method=hierarchical,
+                                             levels=['category'], store=store, lite=lite, resolution=resolution):
+            yield {
+                'category_id': node['category_id'],
+                'code': node['code'],
+                'description': node['description'],
+                'trend': node['trend'],
+                'expected_change_pct': node['expected_change'],
+                'recent_events': node['recent_events'],
+                'forecast_next_week': int(node['forecast'][7]) if len(node['forecast']) > 7 else node['recent_events']
+            }
+        return
+    
+    dates = window(store['dates'], days)
+    rows = np.flatnonzero(window(store['category_events'], days).any(axis=1))
+    events = take_rows(window(store['category_events'], days), rows)
+    for i, forecast in iter_forecasts(dates, events, forecast_days=forecast_days, lite=lite, resolution=resolution):
+        row = rows[i]
+        recent_events = int(events[i, -7:].sum())
+        yield {
+            'category_id': int(store['category_id'][row]),
+            'code': str(store['category_code'][row]),
+            'description': str(store['category_description'][row]),
+            'trend': forecast['trend'],
+            'expected_change_pct': forecast['expected_change'],
+            'recent_events': recent_events,
+            'forecast_next_week': int(forecast['forecast'][7]) if len(forecast['forecast']) > 7 else recent_events
+        }
+
+def iter_predictive_searches(lite=LITE_MODE, resolution='daily', hierarchical=None, store=None):
+    """
+    Yield predictive search suggestions as each analysis completes
+    
+    Unsorted; generate_predictive_searches ranks them by confidence.
+    
+    Args:
+        lite: Use NumPy-only forecasting (no pandas/statsmodels)
+        resolution: Model resolution for the overall trend forecast
+        hierarchical: Reconciliation method to take the overall forecast from
+            the reconciled system total instead of a separate fit
+        store: Series store for this run (loaded if not given)
+    """
+    from series_store import window
+    store = run_store(store)
+    
+    # Get top contamination category (last 30 days)
+    category_counts = window(store['category_events'], 30).sum(axis=1)
+    if category_counts.any():
+        top = int(np.argmax(category_counts))
+        description = str(store['category_description'][top])
+        yield {
+            'title': f"Focus on {description}",
+            'description': f"{int(category_counts[top])} events in the last 30 days",
+            'queryType': 'category',
+            'queryParams': {'categoryId': int(store['category_id'][top])},
+            'confidence': 0.85,
+            'insight': f"{description} is the most common contamination type. Analysis suggests this pattern will continue without intervention. Click here to generate an email to inform the customer about the contamination type."
+        }
+    
+    # Find high severity routes
+    route_counts = window(store['route_events'], 30).sum(axis=1)
+    route_severity = window(store['route_severity'], 30).sum(axis=1)
+    avg_severity = np.where(route_counts > 0, route_severity / np.maximum(route_counts, 1), 0.0)
+    if (avg_severity >= 4.0).any():
+        worst = int(np.argmax(avg_severity))
+        route_code = str(store['route_code'][worst])
+        yield {
+            'title': f"High Severity Alert - Route {route_code}",
+            'description': f"Average severity: {avg_severity[worst]:.1f}/5",
+            'queryType': 'severity',
+            'queryParams': {'routeId': int(store['route_id'][worst]), 'minSeverity': 4},
+            'confidence': 0.9,
+            'insight': f"Route {route_code} has consistently high severity contamination (avg {avg_severity[worst]:.1f}/5). Analysis suggests immediate action is needed."
+        }
+    
+    # Overall trend prediction
+    overall_forecast = None
+    if hierarchical:
+        from hierarchy import iter_hierarchy_forecasts
+        total = next(iter_hierarchy_forecasts(days=90, forecast_days=14, method=hierarchical,
+                                              levels=['total'], store=store, lite=lite,
+                                              resolution=resolution), None)
+        if total:
+            overall_forecast = total
+            current_daily = total['recent_events'] / 7.0
+    else:
+        overall_ts = window(store['total_events'], 90)
+        if len(overall_ts) >= 14:
+            overall_forecast = forecast_series(window(store['dates'], 90), overall_ts, forecast_days=14,
+                                               lite=lite, resolution=resolution)
+            current_daily = overall_ts[-7:].mean()
+    
+    if overall_forecast and overall_forecast['trend'] == 'increasing':
+        yield {
+            'title': 'Overall Contamination Trend Alert',
+            'description': f"Analysis predicts {overall_forecast['expected_change']:.1f}% increase in next 2 weeks",
+            'queryType': 'trend',
+            'queryParams': {
+                'startDate': datetime.now().isoformat(),
+                'endDate': (datetime.now() + timedelta(days=14)).isoformat()
+            },
+            'confidence': min(0.9, 0.7 + abs(overall_forecast['expected_change']) / 200),
+            'insight': f"Analysis forecasts increasing contamination system-wide. Expected {int(overall_forecast['forecast'][13])} events in 2 weeks (current: {int(current_daily)} per day). Create a new campaign generated from this analysis here."
+        }
+
+def generate_predictive_searches(lite=LITE_MODE, resolution='daily', hierarchical=None, store=None):
+    """
+    Generate predictive search suggestions using SARIMA models
+    Returns JSON compatible with TypeScript PredictiveSearch interface
+    
+    Args:
+        lite: Use NumPy-only forecasting (no pandas/statsmodels)
+        resolution: Model resolution for the overall trend forecast
+        hierarchical: Reconciliation method, or None for independent fits
+        store: Series store for this run (loaded if not given)
+    """
+    searches = list(iter_predictive_searches(lite=lite, resolution=resolution, hierarchical=hierarchical,
+                                             store=store))
     
     # Sort by confidence and return top 5
     searches.sort(key=lambda x: x['confidence'], reverse=True)
     return searches[:5]
 
+def json_default(value):
+    """Serialize the NumPy arrays / scalars and Decimals that come out of the analyses"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def emit_ndjson(records):
+    """Write each record as one JSON line, flushing so consumers see it immediately"""
+    for record in records:
+        # allow_nan=False: a bare NaN would break JSON.parse on the TypeScript side
+        sys.stdout.write(json.dumps(record, default=json_default, allow_nan=False) + '\n')
+        sys.stdout.flush()
+
 if __name__ == '__main__':
-    """CLI interface - outputs JSON for TypeScript backend"""
+    """
+    CLI interface - outputs JSON for TypeScript backend
+    
+    With no subcommand, prints the top predictive searches as one JSON array.
+    Subcommands stream newline-delimited JSON, one record per line, as each
+    series finishes.
+    """
+    parser = argparse.ArgumentParser(description="SARIMA predictive searches")
+    parser.add_argument('--lite', action='store_true', default=LITE_MODE,
+                        help="NumPy-only forecasting; skips pandas/statsmodels imports")
+    parser.add_argument('--resolution', choices=sorted(RESOLUTIONS), default='daily',
+                        help="Fit models on daily, weekly or monthly totals")
+    parser.add_argument('--hierarchical', action='store_true',
+                        help="Forecast from one reconciled facility/route/category hierarchy")
+    parser.add_argument('--reconcile', choices=['bottom_up', 'middle_out', 'mint'], default='mint',
+                        help="Reconciliation method for --hierarchical and the hierarchy subcommand")
+    parser.add_argument('--store', default=os.getenv('SERIES_STORE_PATH'),
+                        help="Read series from this store file (written by the store subcommand) "
+                             "instead of the database")
+    subparsers = parser.add_subparsers(dest='command')
+    
+    subparsers.add_parser('searches', help="Predictive searches (unsorted) as NDJSON")
+    subparsers.add_parser('route-trends', help="Per-route trend predictions as NDJSON")
+    
+    forecast_parser = subparsers.add_parser('forecast', help="Full forecasts for routes as NDJSON")
+    forecast_parser.add_argument('--route', type=int, action='append', required=True,
+                                 help="Route ID (repeat for several routes)")
+    forecast_parser.add_argument('--days', type=int, default=365, help="Days of history")
+    forecast_parser.add_argument('--forecast-days', type=int, default=30, help="Days to forecast")
+    forecast_parser.add_argument('--interval', type=float, action='append',
+                                 help="Confidence level in percent (repeat for several; default 95)")
+    
+    categories_parser = subparsers.add_parser('categories', help="Per-category trend predictions as NDJSON")
+    categories_parser.add_argument('--days', type=int, default=365, help="Days of history")
+    categories_parser.add_argument('--forecast-days', type=int, default=30, help="Days to forecast")
+    
+    hierarchy_parser = subparsers.add_parser('hierarchy', help="Reconciled forecasts for every hierarchy node as NDJSON")
+    hierarchy_parser.add_argument('--days', type=int, default=365, help="Days of history")
+    hierarchy_parser.add_argument('--forecast-days', type=int, default=30, help="Days to forecast")
+    hierarchy_parser.add_argument('--level', action='append',
+                                  choices=['total', 'facility', 'route', 'category', 'route_category'],
+                                  help="Only emit this level (repeat for several)")
+    hierarchy_parser.add_argument('--interval', type=float, action='append',
+                                  help="Confidence level in percent (repeat for several; default 95)")
+    
+    store_parser = subparsers.add_parser('store', help="Load the series store once and save it to a file")
+    store_parser.add_argument('--days', type=int, default=365, help="Days of history")
+    store_parser.add_argument('--output', required=True, help="Output .npz path")
+    
+    decompose_parser = subparsers.add_parser('decompose', help="Trend/weekly/yearly components per route as NDJSON")
+    decompose_parser.add_argument('--days', type=int, default=730, help="Days of history")
+    
+    args = parser.parse_args()
+    options = {'lite': args.lite, 'resolution': args.resolution,
+               'hierarchical': args.reconcile if args.hierarchical else None}
+    intervals = getattr(args, 'interval', None) or []
+    if any(not 0 < level < 100 for level in intervals):
+        parser.error("--interval must be between 0 and 100")
+    interval_levels = tuple(level / 100 for level in intervals) or INTERVAL_LEVELS
+    
     try:
-        searches = generate_predictive_searches()
-        print(json.dumps(searches, indent=2))
+        if args.command not in ('store', 'decompose'):
+            # One load shared by every analysis in this run
+            from series_store import get_series_store, STORE_DAYS
+            options['store'] = get_series_store(args.store, days=max(STORE_DAYS, getattr(args, 'days', 0)))
+        
+        if args.command == 'searches':
+            emit_ndjson(iter_predictive_searches(**options))
+        elif args.command == 'route-trends':
+            emit_ndjson(iter_route_trends(**options))
+        elif args.command == 'forecast':
+            emit_ndjson(iter_route_forecasts(args.route, days=args.days, forecast_days=args.forecast_days,
+                                             interval_levels=interval_levels, **options))
+        elif args.command == 'categories':
+            emit_ndjson(iter_category_trends(days=args.days,
+                                             forecast_days=args.forecast_days, **options))
+        elif args.command == 'hierarchy':
+            from hierarchy import iter_hierarchy_forecasts
+            emit_ndjson(iter_hierarchy_forecasts(days=args.days, forecast_days=args.forecast_days,
+                                                 method=args.reconcile, levels=args.level,
+                                                 store=options['store'], interval_levels=interval_levels,
+                                                 lite=args.lite, resolution=args.resolution))
+        elif args.command == 'store':
+            from series_store import fetch_series_store, save_store
+            store = fetch_series_store(args.days)
+            save_store(store, args.output)
+            print(json.dumps({
+                'path': args.output,
+                'routes': len(store['route_id']),
+                'categories': len(store['category_id']),
+                'days': len(store['dates'])
+            }))
+        elif args.command == 'decompose':
+            from decomposition import iter_decompositions
+            emit_ndjson(iter_decompositions(days=args.days))
+        else:
+            searches = generate_predictive_searches(**options)
+            print(json.dumps(searches, indent=2, default=json_default, allow_nan=False))
     except Exception as e:
         print(json.dumps({
             'error': str(e),
             'searches': []
         }), file=sys.stderr)
         sys.exit(1)
-
-
-
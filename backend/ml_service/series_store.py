@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Compact Series Store
+Daily contamination event counts and severity sums for every route x
+category, plus route, category and system totals, held as contiguous int32
+arrays indexed by series and day offset. Loaded once per run (two queries)
+and shared by every analysis as zero-copy views; saves to and reloads from
+a single .npz file.
+"""
+
+import os
+from datetime import date
+
+import numpy as np
+
+from sarima_predictor import get_db_connection, event_window_clause
+
+# Configuration
+STORE_DAYS = 365             # longest default analysis window
+STORE_PATH = os.getenv('SERIES_STORE_PATH')
+
+# (rows x days) int32 arrays; events/severity are route x category x days
+SERIES_KEYS = ['events', 'severity', 'route_events', 'route_severity',
+               'category_events', 'category_severity', 'total_events', 'total_severity']
+
+
+def fetch_series_store(days=STORE_DAYS):
+    """
+    Load the store from the database
+
+    Columns cover CURRENT_DATE - days through CURRENT_DATE, matching the
+    `pickup_time >= CURRENT_DATE - INTERVAL 'N days'` windows used elsewhere.
+
+    Args:
+        days: Number of days of history
+
+    Returns:
+        Store dict: dates, route / category metadata arrays and the
+        SERIES_KEYS count arrays
+    """
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT CURRENT_DATE")
+        today = np.datetime64(cursor.fetchone()[0], 'D')
+        cursor.execute("""
+            SELECT r.route_id, r.route_code, r.active, r.facility_id, f.name
+            FROM routes r
+            INNER JOIN facilities f ON r.facility_id = f.facility_id
+            ORDER BY r.route_id
+        """)
+        routes = cursor.fetchall()
+        cursor.execute("SELECT category_id, code, description FROM contamination_categories ORDER BY category_id")
+        categories = cursor.fetchall()
+        cursor.execute("""
+            SELECT
+                p.route_id,
+                ce.category_id,
+                p.pickup_time::date - (CURRENT_DATE - %s) as day_offset,
+                COUNT(ce.contamination_id) as count,
+                SUM(ce.severity) as severity
+            FROM contamination_events ce
+            INNER JOIN pickups p ON ce.pickup_id = p.pickup_id
+            WHERE p.pickup_time >= CURRENT_DATE - INTERVAL '%s days'%s
+            GROUP BY p.route_id, ce.category_id, p.pickup_time::date
+        """ % (days, days, event_window_clause(days)))
+        rows = cursor.fetchall()
+    finally:
+        conn.close()
+
+    store = {
+        'dates': np.arange(today - days, today + 1),
+        'route_id': np.array([route[0] for route in routes], dtype=np.int32),
+        'route_code': np.array([route[1] for route in routes], dtype=str),
+        'route_active': np.array([route[2] for route in routes], dtype=bool),
+        'facility_id': np.array([route[3] for route in routes], dtype=np.int32),
+        'facility_name': np.array([route[4] for route in routes], dtype=str),
+        'category_id': np.array([category[0] for category in categories], dtype=np.int32),
+        'category_code': np.array([category[1] for category in categories], dtype=str),
+        'category_description': np.array([category[2] for category in categories], dtype=str),
+    }
+
+    shape = (len(routes), len(categories), days + 1)
+    events = np.zeros(shape, dtype=np.int32)
+    severity = np.zeros(shape, dtype=np.int32)
+    if rows and len(routes) and len(categories):
+        # All-integer rows convert in one pass (no per-row date objects)
+        row_route, row_category, offsets, counts, severity_sums = np.array(rows, dtype=np.int64).T
+        route_pos = np.minimum(np.searchsorted(store['route_id'], row_route), len(routes) - 1)
+        category_pos = np.minimum(np.searchsorted(store['category_id'], row_category), len(categories) - 1)
+        keep = ((store['route_id'][route_pos] == row_route) & (store['category_id'][category_pos] == row_category)
+                & (offsets >= 0) & (offsets <= days))
+        index = (route_pos[keep], category_pos[keep], offsets[keep])
+        events[index] = counts[keep]
+        severity[index] = severity_sums[keep]
+
+    store['events'] = events
+    store['severity'] = severity
+    return add_totals(store)
+
+
+def add_totals(store):
+    """Route, category and system totals as their own contiguous arrays"""
+    events, severity = store['events'], store['severity']
+    store['route_events'] = events.sum(axis=1, dtype=np.int32)
+    store['route_severity'] = severity.sum(axis=1, dtype=np.int32)
+    store['category_events'] = events.sum(axis=0, dtype=np.int32)
+    store['category_severity'] = severity.sum(axis=0, dtype=np.int32)
+    store['total_events'] = store['route_events'].sum(axis=0, dtype=np.int32)
+    store['total_severity'] = store['route_severity'].sum(axis=0, dtype=np.int32)
+    return store
+
+
+def save_store(store, path):
+    """Write the store to a single uncompressed .npz file"""
+    np.savez(path, **{key: store[key] for key in store if key not in SERIES_KEYS[2:]})
+
+
+def load_store(path):
+    """Read a store written by save_store (totals are rebuilt, not stored)"""
+    with np.load(path, allow_pickle=False) as data:
+        store = {key: data[key] for key in data.files}
+    return add_totals(store)
+
+
+def database_today():
+    """
+    The database's CURRENT_DATE, which a store's last column was built on
+
+    Falls back to the host's date when the database can't be reached (a
+    saved store can be analysed offline).
+    """
+    try:
+        conn = get_db_connection()
+    except Exception:
+        return np.datetime64(date.today(), 'D')
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT CURRENT_DATE")
+        return np.datetime64(cursor.fetchone()[0], 'D')
+    finally:
+        conn.close()
+
+
+def get_series_store(path=STORE_PATH, days=STORE_DAYS):
+    """
+    Store for this run: from path when given and present, else the database
+
+    A saved store must end on the database's CURRENT_DATE and cover days:
+    window() treats the last column as CURRENT_DATE, so an older or shorter
+    file would silently skew every "last N days" figure. The check uses the
+    database's date rather than the host's, since the two can differ by
+    time zone or clock.
+
+    Args:
+        path: Optional .npz written by save_store
+        days: Days of history the run needs
+
+    Raises:
+        ValueError: The saved store is stale or shorter than days
+    """
+    if path and os.path.exists(path):
+        store = load_store(path)
+        last = store['dates'][-1]
+        today = database_today()
+        if last != today:
+            raise ValueError("Series store %s ends %s, not the database's %s - rebuild it with the store subcommand"
+                             % (path, last, today))
+        if len(store['dates']) - 1 < days:
+            raise ValueError("Series store %s covers %d days, %d requested - rebuild it with a larger --days"
+                             % (path, len(store['dates']) - 1, days))
+        return store
+    return fetch_series_store(days)
+
+
+def window(series, days):
+    """
+    View of the last days+1 columns (CURRENT_DATE - days .. CURRENT_DATE)
+
+    Works on 1-D series and on (rows x days) arrays; never copies.
+    """
+    return series[..., max(series.shape[-1] - days - 1, 0):]
+
+
+def take_rows(series, rows):
+    """
+    series[rows] along the first axis, as a view when rows are contiguous
+
+    Fancy indexing always copies; rows from np.flatnonzero (sorted, unique)
+    that form one run - every route active, say - become a slice instead.
+    """
+    rows = np.asarray(rows)
+    if len(rows) and rows[-1] - rows[0] + 1 == len(rows):
+        return series[rows[0]:rows[-1] + 1]
+    return series[rows]
+
+
+def mean_severity(events, severity):
+    """Event-weighted mean severity over a window, None with no events (NaN isn't valid JSON)"""
+    total = events.sum()
+    return float(severity.sum() / total) if total else None
@@ -1,9 +1,22 @@
-import { exec } from 'child_process';
-import { promisify } from 'util';
+import { spawn } from 'child_process';
+import * as readline from 'readline';
 import * as path from 'path';
 import { PredictiveSearch } from './TrendAnalysisService';
 
-const execAsync = promisify(exec);
+/**
+ * Additive decomposition of one route's daily contamination counts
+ * (observed = trend + weekly + yearly + residual, one value per date)
+ */
+export interface RouteDecomposition {
+  routeId: number;
+  routeCode: string;
+  dates: string[];
+  observed: number[];
+  trend: number[];
+  weekly: number[];
+  yearly: number[];
+  residual: number[];
+}
 
 /**
  * ML-Powered Trend Analysis Service using SARIMA models
@@ -37,35 +50,14 @@ export class MLTrendAnalysisService {
    */
   async generatePredictiveSearches(): Promise<PredictiveSearch[]> {
     try {
-      // Set environment variables for database connection
-      const env = {
-        ...process.env,
-        DB_NAME: process.env.DB_NAME || 'recycling_contamination',
-        DB_USER: process.env.DB_USER || 'mavakian',
-        DB_PASSWORD: process.env.DB_PASSWORD || '',
-        DB_HOST: process.env.DB_HOST || 'localhost',
-        DB_PORT: process.env.DB_PORT || '5432',
-      };
-
-      // Call Python script
-      const { stdout, stderr } = await execAsync(
-        `python3 "${this.pythonScriptPath}"`,
-        { env, maxBuffer: 10 * 1024 * 1024 } // 10MB buffer
-      );
-
-      if (stderr && !stderr.includes('warnings')) {
-        console.warn('Python ML service warnings:', stderr);
-      }
-
-      // Parse JSON response
-      const searches = JSON.parse(stdout) as PredictiveSearch[];
-
-      // Validate response structure
-      if (!Array.isArray(searches)) {
-        throw new Error('Invalid response from ML service: expected array');
+      const searches: PredictiveSearch[] = [];
+      for await (const search of this.streamRecords<PredictiveSearch>('searches')) {
+        searches.push(search);
       }
 
-      return searches;
+      // The stream is unsorted; rank by confidence and keep the top 5
+      searches.sort((a, b) => b.confidence - a.confidence);
+      return searches.slice(0, 5);
     } catch (error) {
       console.error('Error calling ML service:', error);
       
@@ -74,6 +66,84 @@ export class MLTrendAnalysisService {
     }
   }
 
+  /**
+   * Trend / weekly / yearly components for every active route
+   *
+   * Computed in one batched pass by the Python service and cached there
+   * until new pickups or contamination events arrive.
+   */
+  async getRouteDecompositions(days: number = 730): Promise<RouteDecomposition[]> {
+    const decompositions: RouteDecomposition[] = [];
+    for await (const record of this.streamRecords<any>('decompose', ['--days', String(days)])) {
+      decompositions.push({
+        routeId: record.route_id,
+        routeCode: record.route_code,
+        dates: record.dates,
+        observed: record.observed,
+        trend: record.trend,
+        weekly: record.weekly,
+        yearly: record.yearly,
+        residual: record.residual
+      });
+    }
+    return decompositions;
+  }
+
+  /**
+   * Stream records from a predictor subcommand (searches, route-trends,
+   * forecast, categories, decompose) as the Python script emits them.
+   *
+   * The script writes newline-delimited JSON and flushes after each series,
+   * so callers can use partial results early and nothing is buffered whole.
+   */
+  async *streamRecords<T>(command: string, args: string[] = []): AsyncGenerator<T> {
+    // Set environment variables for database connection
+    const env = {
+      ...process.env,
+      DB_NAME: process.env.DB_NAME || 'recycling_contamination',
+      DB_USER: process.env.DB_USER || 'mavakian',
+      DB_PASSWORD: process.env.DB_PASSWORD || '',
+      DB_HOST: process.env.DB_HOST || 'localhost',
+      DB_PORT: process.env.DB_PORT || '5432',
+    };
+
+    const child = spawn('python3', [this.pythonScriptPath, command, ...args], { env });
+
+    let stderr = '';
+    child.stderr.on('data', (chunk) => {
+      stderr += chunk;
+    });
+
+    const exitCode = new Promise<number | null>((resolve, reject) => {
+      child.on('error', reject);
+      child.on('close', resolve);
+    });
+    // Checked after stdout ends; avoid an unhandled rejection before then
+    exitCode.catch(() => undefined);
+
+    try {
+      const lines = readline.createInterface({ input: child.stdout, crlfDelay: Infinity });
+      for await (const line of lines) {
+        if (line.trim()) {
+          yield JSON.parse(line) as T;
+        }
+      }
+
+      const code = await exitCode;
+      if (code !== 0) {
+        throw new Error(`ML service exited with code ${code}: ${stderr.trim()}`);
+      }
+      if (stderr && !stderr.includes('warnings')) {
+        console.warn('Python ML service warnings:', stderr);
+      }
+    } finally {
+      // Consumer stopped early or parsing failed
+      if (child.exitCode === null) {
+        child.kill();
+      }
+    }
+  }
+
   /**
    * Fallback default searches when ML service is unavailable
    */
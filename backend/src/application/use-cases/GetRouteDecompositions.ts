@@ -0,0 +1,15 @@
+import { MLTrendAnalysisService, RouteDecomposition } from '../services/MLTrendAnalysisService';
+
+/**
+ * Use Case: Get Route Decompositions
+ * Returns trend and weekly/yearly seasonal components for every route
+ */
+export class GetRouteDecompositions {
+  constructor(
+    private mlTrendAnalysisService: MLTrendAnalysisService
+  ) {}
+
+  async execute(days?: number): Promise<RouteDecomposition[]> {
+    return await this.mlTrendAnalysisService.getRouteDecompositions(days);
+  }
+}
@@ -17,6 +17,7 @@ import { GetContaminationByRoute } from '../../application/use-cases/GetContamin
 import { GetContaminationOverTime } from '../../application/use-cases/GetContaminationOverTime';
 import { GetWorstOffendingCustomers } from '../../application/use-cases/GetWorstOffendingCustomers';
 import { GetPredictiveSearches } from '../../application/use-cases/GetPredictiveSearches';
+import { GetRouteDecompositions } from '../../application/use-cases/GetRouteDecompositions';
 import { MLTrendAnalysisService } from '../../application/services/MLTrendAnalysisService';
 
 import { ContaminationController } from '../../presentation/controllers/ContaminationController';
@@ -48,6 +49,7 @@ export const getWorstOffendingCustomers = new GetWorstOffendingCustomers(
  */
 export const mlTrendAnalysisService = new MLTrendAnalysisService();
 export const getPredictiveSearches = new GetPredictiveSearches(mlTrendAnalysisService);
+export const getRouteDecompositions = new GetRouteDecompositions(mlTrendAnalysisService);
 
 /**
  * Presentation Layer: Controllers
@@ -55,6 +57,7 @@ export const getPredictiveSearches = new GetPredictiveSearches(mlTrendAnalysisSe
 export const contaminationController = new ContaminationController(
   getContaminationByRoute,
   getContaminationOverTime,
-  getPredictiveSearches
+  getPredictiveSearches,
+  getRouteDecompositions
 );
 
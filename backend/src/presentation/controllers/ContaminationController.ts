@@ -2,6 +2,7 @@ import { Request, Response } from 'express';
 import { GetContaminationByRoute } from '../../application/use-cases/GetContaminationByRoute';
 import { GetContaminationOverTime } from '../../application/use-cases/GetContaminationOverTime';
 import { GetPredictiveSearches } from '../../application/use-cases/GetPredictiveSearches';
+import { GetRouteDecompositions } from '../../application/use-cases/GetRouteDecompositions';
 import { getDatabasePool } from '../../infrastructure/database/connection';
 
 /**
@@ -12,7 +13,8 @@ export class ContaminationController {
   constructor(
     private getContaminationByRoute: GetContaminationByRoute,
     private getContaminationOverTime: GetContaminationOverTime,
-    private getPredictiveSearchesUseCase: GetPredictiveSearches
+    private getPredictiveSearchesUseCase: GetPredictiveSearches,
+    private getRouteDecompositionsUseCase: GetRouteDecompositions
   ) {}
 
   async getByRoute(req: Request, res: Response): Promise<void> {
@@ -108,5 +110,24 @@ export class ContaminationController {
       });
     }
   }
-}
 
+  async getDecomposition(req: Request, res: Response): Promise<void> {
+    try {
+      const days = req.query.days ? parseInt(req.query.days as string) : undefined;
+      if (days !== undefined && (isNaN(days) || days < 1)) {
+        res.status(400).json({ error: 'Invalid days' });
+        return;
+      }
+
+      const decompositions = await this.getRouteDecompositionsUseCase.execute(days);
+      res.json(decompositions);
+    } catch (error) {
+      console.error('Error getting route decompositions:', error);
+      const errorMessage = error instanceof Error ? error.message : 'Unknown error';
+      res.status(500).json({ 
+        error: 'Internal server error',
+        message: process.env.NODE_ENV === 'development' ? errorMessage : undefined
+      });
+    }
+  }
+}
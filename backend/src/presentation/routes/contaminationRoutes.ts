@@ -7,6 +7,7 @@ export function createContaminationRoutes(controller: ContaminationController):
   router.get('/route/:routeId', (req, res) => controller.getByRoute(req, res));
   router.get('/over-time', (req, res) => controller.getOverTime(req, res));
   router.get('/predictive-searches', (req, res) => controller.getPredictiveSearches(req, res));
+  router.get('/decomposition', (req, res) => controller.getDecomposition(req, res));
 
   return router;
 }
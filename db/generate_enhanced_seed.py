@@ -4,9 +4,12 @@ Generate enhanced seed data for trend alerts and visualizations
 Creates realistic contamination data with clear trends over the last 90 days
 """
 
+import argparse
 import random
 from datetime import datetime, timedelta
 
+from seed_export import ID_OFFSETS, write_partition_files
+
 # Set seed for reproducibility
 random.seed(42)
 
@@ -74,6 +77,27 @@ ROUTE_CONTAINERS = {
 
 DRIVERS = ['Mike Rodriguez', 'Sarah Johnson', 'Carlos Mendez', 'David Kim', 'Lisa Wang', 'James Lee']
 
+PICKUP_NOTES = [
+    'Normal pickup',
+    'Heavy load',
+    'Contamination noted',
+    'High contamination',
+    'Some contamination observed'
+]
+
+CONTAMINATION_NOTES = [
+    'Plastic bags contamination',
+    'Food waste mixed in',
+    'Styrofoam containers',
+    'Dirty containers',
+    'Some contamination observed',
+    'High contamination',
+    'Many plastic bags',
+    'Significant food waste',
+    'Heavy plastic bag contamination',
+    None
+]
+
 def generate_enhanced_seed_data():
     """Generate enhanced seed data with clear trends"""
     
@@ -123,14 +147,7 @@ def generate_enhanced_seed_data():
                     # Add notes occasionally
                     notes = None
                     if random.random() < 0.1:
-                        notes_options = [
-                            'Normal pickup',
-                            'Heavy load',
-                            'Contamination noted',
-                            'High contamination',
-                            'Some contamination observed'
-                        ]
-                        notes = random.choice(notes_options)
+                        notes = random.choice(PICKUP_NOTES)
                     
                     pickup_time = current_date.replace(
                         hour=random.randint(7, 10),
@@ -165,19 +182,7 @@ def generate_enhanced_seed_data():
                         category_id = random.choice(pattern['categories'])
                         
                         # Notes for contamination
-                        notes_options = [
-                            'Plastic bags contamination',
-                            'Food waste mixed in',
-                            'Styrofoam containers',
-                            'Dirty containers',
-                            'Some contamination observed',
-                            'High contamination',
-                            'Many plastic bags',
-                            'Significant food waste',
-                            'Heavy plastic bag contamination',
-                            None
-                        ]
-                        contamination_notes = random.choice(notes_options)
+                        contamination_notes = random.choice(CONTAMINATION_NOTES)
                         
                         contamination_events.append({
                             'contamination_id': contamination_id,
@@ -195,6 +200,79 @@ def generate_enhanced_seed_data():
     
     return pickups, contamination_events
 
+def generate_shard(shard, rng):
+    """
+    Generate one (route, month) shard with NumPy draws (see seed_shards.py)
+
+    Same model as generate_enhanced_seed_data - the route's trend over the
+    90 days, weekend effect, severity profile and category mix, ~20% daily
+    pickup chance per container - drawn for the whole shard at once from the
+    shard's own stream.
+
+    Args:
+        shard: Shard dict from seed_shards.plan_shards
+        rng: numpy Generator for this shard
+
+    Returns:
+        Tuple of (pickup dicts, contamination event dicts) with final IDs
+    """
+    # NumPy only for --shard-dir; the sequential generator stays stdlib-only
+    import numpy as np
+    from seed_shards import shard_days
+
+    days = shard_days(shard)
+    route_id = shard['route_id']
+    pattern = ROUTE_PATTERNS[route_id]
+    containers = np.array(shard['containers'])
+
+    progress = (days - np.datetime64(shard['origin'])).astype(int) / 90.0  # 0 to 1
+    direction = {'increasing': 1.0, 'decreasing': -1.0}.get(pattern['trend'], 0.0)
+    weekday = (days.astype(int) - 4) % 7  # 1970-01-01 was a Thursday; 0 = Monday
+    contamination_rate = pattern['base_rate'] * (1.0 + direction * pattern['trend_strength'] * progress)
+    contamination_rate = np.minimum(np.where(weekday >= 5, contamination_rate * 1.1, contamination_rate), 0.5)
+
+    # Pickups, day-major like the sequential generator
+    day_index, container_index = np.nonzero(rng.random((len(days), len(containers))) < 0.20)
+    n = len(day_index)
+    weights = np.round(rng.uniform(8.0, 22.0, n), 1).tolist()
+    drivers = rng.integers(0, len(DRIVERS), n)
+    has_notes = rng.random(n) < 0.1
+    pickup_notes = rng.integers(0, len(PICKUP_NOTES), n)
+    minutes = rng.integers(7, 11, n) * 60 + rng.choice([0, 15, 30, 45], n)
+    pickup_times = (days[day_index] + minutes.astype('timedelta64[m]')).astype('datetime64[s]').tolist()
+    pickup_ids = shard['first_id'] + np.arange(n)
+
+    pickups = [{
+        'pickup_id': int(pickup_ids[i]),
+        'container_id': int(containers[container_index[i]]),
+        'route_id': route_id,
+        'pickup_time': pickup_times[i],
+        'weight_kg': weights[i],
+        'driver_name': DRIVERS[drivers[i]],
+        'notes': PICKUP_NOTES[pickup_notes[i]] if has_notes[i] else None
+    } for i in range(n)]
+
+    # Contamination events from the route's severity profile and category mix
+    contaminated = np.flatnonzero(rng.random(n) < contamination_rate[day_index])
+    m = len(contaminated)
+    profile = np.array(pattern['severity_profile'])
+    severity = rng.choice(np.arange(1, 6), m, p=profile / profile.sum())
+    contamination_pct = np.round(rng.uniform(severity * 5, severity * 8), 1).tolist()
+    categories = rng.choice(pattern['categories'], m)
+    notes = rng.integers(0, len(CONTAMINATION_NOTES), m)
+
+    contamination_events = [{
+        'contamination_id': shard['first_id'] + j,
+        'pickup_id': int(pickup_ids[i]),
+        'pickup_time': pickup_times[i],
+        'category_id': int(categories[j]),
+        'severity': int(severity[j]),
+        'estimated_contamination_pct': contamination_pct[j],
+        'notes': CONTAMINATION_NOTES[notes[j]]
+    } for j, i in enumerate(contaminated)]
+
+    return pickups, contamination_events
+
 def generate_sql_inserts(pickups, contamination_events):
     """Generate SQL INSERT statements"""
     
@@ -272,43 +350,83 @@ def generate_sql_inserts(pickups, contamination_events):
     return "\n".join(sql_lines)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate enhanced seed data")
+    parser.add_argument('--partition-dir',
+                        help="Write one COPY load file per monthly partition into this "
+                             "directory (for db/schema_partitioned.sql) instead of a single SQL dump")
+    parser.add_argument('--id-offset', type=int, default=ID_OFFSETS['enhanced'],
+                        help="Offset added to pickup/contamination IDs in partition / shard files "
+                             "(default: %(default)s, past the IDs seed.sql assigns)")
+    parser.add_argument('--shard-dir',
+                        help="Generate (route, month) shards in parallel, one COPY load file "
+                             "each plus manifest.json, into this directory (see seed_shards.py)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes for --shard-dir (default: CPU count)")
+    parser.add_argument('--seed', type=int, default=42,
+                        help="Root seed for --shard-dir; output is identical for any --workers")
+    args = parser.parse_args()
+
     print("Generating enhanced seed data...")
     print(f"Date range: {START_DATE.date()} to {END_DATE.date()}")
     print(f"Routes configured with different trends:")
     for route_id, pattern in ROUTE_PATTERNS.items():
         print(f"  Route {route_id}: {pattern['trend']} trend ({pattern['trend_strength']*100:.0f}% change)")
     
-    pickups, contamination_events = generate_enhanced_seed_data()
-    
-    print(f"\nGenerated {len(pickups)} pickups")
-    print(f"Generated {len(contamination_events)} contamination events")
+    if args.shard_dir:
+        from seed_shards import plan_shards, generate_sharded
+        shards = plan_shards(ROUTE_CONTAINERS, START_DATE.date(), END_DATE.date(),
+                             first_id=1000, id_offset=args.id_offset)
+        manifest = generate_sharded(generate_shard, shards, args.shard_dir,
+                                    prefix='enhanced', seed=args.seed, workers=args.workers)
+        print(f"\nGenerated {manifest['pickups']} pickups")
+        print(f"Generated {manifest['contamination_events']} contamination events")
+        print(f"\n{len(manifest['shards'])} shard files written to {args.shard_dir} "
+              f"(IDs offset by {args.id_offset})")
+        print(f"\nTo use this data:")
+        print(f"  1. Run: psql recycling_contamination -f db/schema_partitioned.sql")
+        print(f"  2. Run: psql recycling_contamination -f db/seed.sql")
+        print(f"  3. Run: db/load_partitions.sh {args.shard_dir}")
+    else:
+        pickups, contamination_events = generate_enhanced_seed_data()
     
-    # Show severity distribution
-    severity_counts = {}
-    for event in contamination_events:
-        severity_counts[event['severity']] = severity_counts.get(event['severity'], 0) + 1
-    print(f"\nSeverity distribution:")
-    for severity in sorted(severity_counts.keys()):
-        print(f"  Level {severity}: {severity_counts[severity]} events")
+        print(f"\nGenerated {len(pickups)} pickups")
+        print(f"Generated {len(contamination_events)} contamination events")
     
-    # Show category distribution
-    category_counts = {}
-    for event in contamination_events:
-        category_counts[event['category_id']] = category_counts.get(event['category_id'], 0) + 1
-    print(f"\nCategory distribution:")
-    for category_id in sorted(category_counts.keys()):
-        print(f"  Category {category_id}: {category_counts[category_id]} events")
+        # Show severity distribution
+        severity_counts = {}
+        for event in contamination_events:
+            severity_counts[event['severity']] = severity_counts.get(event['severity'], 0) + 1
+        print(f"\nSeverity distribution:")
+        for severity in sorted(severity_counts.keys()):
+            print(f"  Level {severity}: {severity_counts[severity]} events")
     
-    sql_content = generate_sql_inserts(pickups, contamination_events)
+        # Show category distribution
+        category_counts = {}
+        for event in contamination_events:
+            category_counts[event['category_id']] = category_counts.get(event['category_id'], 0) + 1
+        print(f"\nCategory distribution:")
+        for category_id in sorted(category_counts.keys()):
+            print(f"  Category {category_id}: {category_counts[category_id]} events")
     
-    # Write to file
-    output_file = "db/enhanced_seed.sql"
-    with open(output_file, 'w') as f:
-        f.write(sql_content)
-    
-    print(f"\nSQL written to {output_file}")
-    print(f"\nTo use this data:")
-    print(f"  1. Run: psql recycling_contamination -f db/schema.sql")
-    print(f"  2. Run: psql recycling_contamination -f db/seed.sql")
-    print(f"  3. Run: psql recycling_contamination -f {output_file}")
-
+        if args.partition_dir:
+            paths = write_partition_files(pickups, contamination_events, args.partition_dir,
+                                          prefix='enhanced', id_offset=args.id_offset)
+            print(f"\n{len(paths)} partition files written to {args.partition_dir} "
+                  f"(IDs offset by {args.id_offset})")
+            print(f"\nTo use this data:")
+            print(f"  1. Run: psql recycling_contamination -f db/schema_partitioned.sql")
+            print(f"  2. Run: psql recycling_contamination -f db/seed.sql")
+            print(f"  3. Run: db/load_partitions.sh {args.partition_dir}")
+        else:
+            sql_content = generate_sql_inserts(pickups, contamination_events)
+        
+            # Write to file
+            output_file = "db/enhanced_seed.sql"
+            with open(output_file, 'w') as f:
+                f.write(sql_content)
+        
+            print(f"\nSQL written to {output_file}")
+            print(f"\nTo use this data:")
+            print(f"  1. Run: psql recycling_contamination -f db/schema.sql")
+            print(f"  2. Run: psql recycling_contamination -f db/seed.sql")
+            print(f"  3. Run: psql recycling_contamination -f {output_file}")
@@ -4,10 +4,13 @@ Generate multi-year seed data for SARIMA model testing
 Creates realistic contamination data with yearly seasonality patterns
 """
 
+import argparse
 import random
 from datetime import datetime, timedelta
 import math
 
+from seed_export import ID_OFFSETS, write_partition_files
+
 # Set seed for reproducibility
 random.seed(42)
 
@@ -38,6 +41,37 @@ SEASONAL_PATTERNS = {
 # Day of week patterns (weekends might have different patterns)
 WEEKEND_MULTIPLIER = 1.1  # Slightly higher contamination on weekends
 
+# Use actual route-container mapping from seed.sql
+# Based on customers -> routes mapping in seed data
+# Route 1: customers 1-3,11-13 -> containers 1-13
+# Route 2: customers 4-6,14-16 -> containers 4-6,8,14-16
+# Route 3: customers 7-10,17-19 -> containers 7,9-11,17-19
+# Route 4: customers 20-24 -> containers 20-24
+# Route 5: customers 9-10,25-27 -> containers 9,10,12-13,25-27
+# Route 6: customers 28-32 -> containers 28-32
+ROUTE_CONTAINERS = {
+    1: [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13],  # Route 1 containers
+    2: [4, 5, 6, 8, 14, 15, 16],                      # Route 2 containers
+    3: [7, 9, 10, 11, 17, 18, 19],                     # Route 3 containers
+    4: [20, 21, 22, 23, 24],                          # Route 4 containers
+    5: [9, 10, 12, 13, 25, 26, 27],                    # Route 5 containers
+    6: [28, 29, 30, 31, 32]                           # Route 6 containers
+}
+
+DRIVERS = ['Mike Rodriguez', 'Sarah Johnson', 'Carlos Mendez',
+           'David Kim', 'Lisa Wang', 'James Lee']
+
+CONTAMINATION_NOTES = [
+    'Plastic bags contamination',
+    'Food waste mixed in',
+    'Styrofoam containers',
+    'Dirty containers',
+    'Some contamination observed',
+    'High contamination',
+    'Minor contamination',
+    None
+]
+
 def generate_pickups_and_contamination():
     """Generate pickups and contamination events with yearly seasonality"""
     
@@ -53,25 +87,7 @@ def generate_pickups_and_contamination():
     containers = []
     container_id = 1
     
-    # Use actual route-container mapping from seed.sql
-    # Based on customers -> routes mapping in seed data
-    # Route 1: customers 1-3,11-13 -> containers 1-13
-    # Route 2: customers 4-6,14-16 -> containers 4-6,8,14-16
-    # Route 3: customers 7-10,17-19 -> containers 7,9-11,17-19
-    # Route 4: customers 20-24 -> containers 20-24
-    # Route 5: customers 9-10,25-27 -> containers 9,10,12-13,25-27
-    # Route 6: customers 28-32 -> containers 28-32
-    
-    route_container_mapping = {
-        1: [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13],  # Route 1 containers
-        2: [4, 5, 6, 8, 14, 15, 16],                      # Route 2 containers
-        3: [7, 9, 10, 11, 17, 18, 19],                     # Route 3 containers
-        4: [20, 21, 22, 23, 24],                          # Route 4 containers
-        5: [9, 10, 12, 13, 25, 26, 27],                    # Route 5 containers
-        6: [28, 29, 30, 31, 32]                           # Route 6 containers
-    }
-    
-    for route_id, container_ids in route_container_mapping.items():
+    for route_id, container_ids in ROUTE_CONTAINERS.items():
         for container_id in container_ids:
             containers.append({
                 'container_id': container_id,
@@ -113,9 +129,7 @@ def generate_pickups_and_contamination():
                 if random.random() < 0.15:  # ~15% chance per day = weekly pickup
                     # Generate pickup
                     weight = round(random.uniform(8.0, 22.0), 1)
-                    driver_names = ['Mike Rodriguez', 'Sarah Johnson', 'Carlos Mendez', 
-                                   'David Kim', 'Lisa Wang', 'James Lee']
-                    driver_name = random.choice(driver_names)
+                    driver_name = random.choice(DRIVERS)
                     
                     pickup_time = current_date.replace(
                         hour=random.randint(7, 10),
@@ -153,17 +167,7 @@ def generate_pickups_and_contamination():
                         category_id = random.randint(1, 8)
                         
                         # Notes
-                        notes_options = [
-                            'Plastic bags contamination',
-                            'Food waste mixed in',
-                            'Styrofoam containers',
-                            'Dirty containers',
-                            'Some contamination observed',
-                            'High contamination',
-                            'Minor contamination',
-                            None
-                        ]
-                        notes = random.choice(notes_options)
+                        notes = random.choice(CONTAMINATION_NOTES)
                         
                         contamination_events.append({
                             'contamination_id': contamination_id,
@@ -182,6 +186,82 @@ def generate_pickups_and_contamination():
     
     return pickups, contamination_events
 
+def generate_shard(shard, rng):
+    """
+    Generate one (route, month) shard with NumPy draws (see seed_shards.py)
+
+    Same model as generate_pickups_and_contamination - seasonal, weekend and
+    yearly-trend contamination rates, ~15% daily pickup chance per
+    container - drawn for the whole shard at once from the shard's own
+    stream.
+
+    Args:
+        shard: Shard dict from seed_shards.plan_shards
+        rng: numpy Generator for this shard
+
+    Returns:
+        Tuple of (pickup dicts, contamination event dicts) with final IDs
+    """
+    # NumPy only for --shard-dir; the sequential generator stays stdlib-only
+    import numpy as np
+    from seed_shards import shard_days
+
+    days = shard_days(shard)
+    route_id = shard['route_id']
+    containers = np.array(shard['containers'])
+
+    months = days.astype('datetime64[M]').astype(int) % 12 + 1
+    weekday = (days.astype(int) - 4) % 7  # 1970-01-01 was a Thursday; 0 = Monday
+    years_passed = (days - np.datetime64(START_DATE.date())).astype(int) / 365.0
+
+    seasonal_mult = np.array([SEASONAL_PATTERNS[m] for m in range(1, 13)])[months - 1]
+    weekend_mult = np.where(weekday >= 5, WEEKEND_MULTIPLIER, 1.0)
+    trend_mult = 1.0 - years_passed * 0.02
+    contamination_prob = np.minimum((0.15 + route_id * 0.02) * seasonal_mult * weekend_mult * trend_mult, 0.5)
+
+    # Pickups, day-major like the sequential generator
+    day_index, container_index = np.nonzero(rng.random((len(days), len(containers))) < 0.15)
+    n = len(day_index)
+    minutes = rng.integers(7, 11, n) * 60 + rng.choice([0, 15, 30, 45], n)
+    pickup_times = (days[day_index] + minutes.astype('timedelta64[m]')).astype('datetime64[s]').tolist()
+    weights = np.round(rng.uniform(8.0, 22.0, n), 1).tolist()
+    drivers = rng.integers(0, len(DRIVERS), n)
+    pickup_ids = shard['first_id'] + np.arange(n)
+
+    pickups = [{
+        'pickup_id': int(pickup_ids[i]),
+        'container_id': int(containers[container_index[i]]),
+        'route_id': route_id,
+        'pickup_time': pickup_times[i],
+        'weight_kg': weights[i],
+        'driver_name': DRIVERS[drivers[i]],
+        'notes': None
+    } for i in range(n)]
+
+    # Contamination events; higher severity in peak months
+    contaminated = np.flatnonzero(rng.random(n) < contamination_prob[day_index])
+    m = len(contaminated)
+    event_season = seasonal_mult[day_index[contaminated]]
+    band_low = np.where(event_season >= 1.2, 3, np.where(event_season >= 1.1, 2, 1))
+    draw = rng.random(m)
+    cutoffs = np.where(band_low == 1, 0.4, 0.3), np.where(band_low == 1, 0.8, 0.7)
+    severity = band_low + (draw >= cutoffs[0]) + (draw >= cutoffs[1])
+    contamination_pct = np.round(rng.uniform(severity * 5, severity * 8), 1).tolist()
+    categories = rng.integers(1, 9, m)
+    notes = rng.integers(0, len(CONTAMINATION_NOTES), m)
+
+    contamination_events = [{
+        'contamination_id': shard['first_id'] + j,
+        'pickup_id': int(pickup_ids[i]),
+        'pickup_time': pickup_times[i],
+        'category_id': int(categories[j]),
+        'severity': int(severity[j]),
+        'estimated_contamination_pct': contamination_pct[j],
+        'notes': CONTAMINATION_NOTES[notes[j]]
+    } for j, i in enumerate(contaminated)]
+
+    return pickups, contamination_events
+
 def generate_sql_inserts(pickups, contamination_events):
     """Generate SQL INSERT statements"""
     
@@ -239,24 +319,64 @@ def generate_sql_inserts(pickups, contamination_events):
     return "\n".join(sql_lines)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate multi-year seed data")
+    parser.add_argument('--partition-dir',
+                        help="Write one COPY load file per monthly partition into this "
+                             "directory (for db/schema_partitioned.sql) instead of a single SQL dump")
+    parser.add_argument('--id-offset', type=int, default=ID_OFFSETS['multi_year'],
+                        help="Offset added to pickup/contamination IDs in partition / shard files "
+                             "(default: %(default)s, past the IDs seed.sql assigns)")
+    parser.add_argument('--shard-dir',
+                        help="Generate (route, month) shards in parallel, one COPY load file "
+                             "each plus manifest.json, into this directory (see seed_shards.py)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes for --shard-dir (default: CPU count)")
+    parser.add_argument('--seed', type=int, default=42,
+                        help="Root seed for --shard-dir; output is identical for any --workers")
+    args = parser.parse_args()
+
     print("Generating multi-year seed data...")
     print(f"Date range: {START_DATE.date()} to {END_DATE.date()}")
+
+    if args.shard_dir:
+        from seed_shards import plan_shards, generate_sharded
+        shards = plan_shards(ROUTE_CONTAINERS, START_DATE.date(), END_DATE.date(),
+                             first_id=1, id_offset=args.id_offset)
+        manifest = generate_sharded(generate_shard, shards, args.shard_dir,
+                                    prefix='multi_year', seed=args.seed, workers=args.workers)
+        print(f"Generated {manifest['pickups']} pickups")
+        print(f"Generated {manifest['contamination_events']} contamination events")
+        print(f"\n{len(manifest['shards'])} shard files written to {args.shard_dir} "
+              f"(IDs offset by {args.id_offset})")
+        print(f"\nTo use this data:")
+        print(f"  1. Run: psql recycling_contamination -f db/schema_partitioned.sql")
+        print(f"  2. Run: psql recycling_contamination -f db/seed.sql")
+        print(f"  3. Run: db/load_partitions.sh {args.shard_dir}")
+    else:
+        pickups, contamination_events = generate_pickups_and_contamination()
     
-    pickups, contamination_events = generate_pickups_and_contamination()
-    
-    print(f"Generated {len(pickups)} pickups")
-    print(f"Generated {len(contamination_events)} contamination events")
-    
-    sql_content = generate_sql_inserts(pickups, contamination_events)
-    
-    # Write to file
-    output_file = "db/multi_year_seed.sql"
-    with open(output_file, 'w') as f:
-        f.write(sql_content)
+        print(f"Generated {len(pickups)} pickups")
+        print(f"Generated {len(contamination_events)} contamination events")
     
-    print(f"\nSQL written to {output_file}")
-    print(f"\nTo use this data:")
-    print(f"  1. Run: psql recycling_contamination -f db/schema.sql")
-    print(f"  2. Run: psql recycling_contamination -f db/seed.sql")
-    print(f"  3. Run: psql recycling_contamination -f {output_file}")
-
+        if args.partition_dir:
+            paths = write_partition_files(pickups, contamination_events, args.partition_dir,
+                                          prefix='multi_year', id_offset=args.id_offset)
+            print(f"\n{len(paths)} partition files written to {args.partition_dir} "
+                  f"(IDs offset by {args.id_offset})")
+            print(f"\nTo use this data:")
+            print(f"  1. Run: psql recycling_contamination -f db/schema_partitioned.sql")
+            print(f"  2. Run: psql recycling_contamination -f db/seed.sql")
+            print(f"  3. Run: db/load_partitions.sh {args.partition_dir}")
+        else:
+            sql_content = generate_sql_inserts(pickups, contamination_events)
+        
+            # Write to file
+            output_file = "db/multi_year_seed.sql"
+            with open(output_file, 'w') as f:
+                f.write(sql_content)
+        
+            print(f"\nSQL written to {output_file}")
+            print(f"\nTo use this data:")
+            print(f"  1. Run: psql recycling_contamination -f db/schema.sql")
+            print(f"  2. Run: psql recycling_contamination -f db/seed.sql")
+            print(f"  3. Run: psql recycling_contamination -f {output_file}")
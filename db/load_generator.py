@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Real-time load generator for pickups and contamination events
+Inserts live pickups into a local PostgreSQL database at a target rate, using
+the route patterns from generate_enhanced_seed.py, and reports achieved
+throughput and insert latency percentiles
+"""
+
+import argparse
+import math
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime
+
+import psycopg2
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
+
+from generate_enhanced_seed import ROUTE_PATTERNS, ROUTE_CONTAINERS, DRIVERS
+
+# Configuration (same variables as backend/ml_service/sarima_predictor.py)
+DB_CONFIG = {
+    'dbname': os.getenv('DB_NAME', 'recycling_contamination'),
+    'user': os.getenv('DB_USER', 'mavakian'),
+    'password': os.getenv('DB_PASSWORD', ''),
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'port': os.getenv('DB_PORT', '5432')
+}
+
+CONTAMINATION_NOTES = [
+    'Plastic bags contamination',
+    'Food waste mixed in',
+    'Styrofoam containers',
+    'Dirty containers',
+    'Some contamination observed',
+    'High contamination',
+    None
+]
+
+
+def generate_batch(rng, size, now):
+    """
+    Generate one batch of live pickups following the enhanced seed route patterns
+
+    Args:
+        rng: random.Random instance
+        size: Number of pickups
+        now: Timestamp for the pickups
+
+    Returns:
+        List of (pickup tuple, contamination tuple or None)
+    """
+    batch = []
+    routes = list(ROUTE_PATTERNS)
+    for _ in range(size):
+        route_id = rng.choice(routes)
+        pattern = ROUTE_PATTERNS[route_id]
+
+        contamination_rate = pattern['base_rate']
+        if now.weekday() >= 5:
+            contamination_rate *= 1.1
+
+        pickup = (
+            rng.choice(ROUTE_CONTAINERS[route_id]),
+            route_id,
+            now,
+            round(rng.uniform(8.0, 22.0), 1),
+            rng.choice(DRIVERS),
+            None
+        )
+
+        event = None
+        if rng.random() < min(contamination_rate, 0.5):
+            severity = rng.choices([1, 2, 3, 4, 5], weights=pattern['severity_profile'])[0]
+            event = (
+                rng.choice(pattern['categories']),
+                severity,
+                round(rng.uniform(severity * 5, severity * 8), 1),
+                rng.choice(CONTAMINATION_NOTES)
+            )
+        batch.append((pickup, event))
+    return batch
+
+
+def insert_batch(conn, batch, partitioned=False):
+    """
+    Insert a batch of pickups and their contamination events in one transaction
+
+    Returns:
+        Number of contamination events inserted
+    """
+    with conn.cursor() as cursor:
+        pickup_ids = execute_values(
+            cursor,
+            "INSERT INTO pickups (container_id, route_id, pickup_time, weight_kg, driver_name, notes) "
+            "VALUES %s RETURNING pickup_id",
+            [pickup for pickup, _ in batch],
+            fetch=True
+        )
+
+        events = []
+        for (pickup, event), (pickup_id,) in zip(batch, pickup_ids):
+            if event is None:
+                continue
+            if partitioned:
+                events.append((pickup_id, pickup[2]) + event)
+            else:
+                events.append((pickup_id,) + event)
+
+        if events:
+            columns = "pickup_id, pickup_time, " if partitioned else "pickup_id, "
+            execute_values(
+                cursor,
+                "INSERT INTO contamination_events (" + columns +
+                "category_id, severity, estimated_contamination_pct, notes) VALUES %s",
+                events
+            )
+    conn.commit()
+    return len(events)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100.0 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def run_load(rate=100.0, batch_size=50, workers=4, duration=60.0, seed=42, partitioned=False):
+    """
+    Insert pickups at a target rate from a pool of worker threads
+
+    A producer thread generates batches on a fixed schedule and hands them to
+    workers through a bounded queue. Generation stops after duration seconds
+    of wall time; if the database can't keep up the queue fills, the slots
+    that fall behind schedule are skipped, and the report counts them as
+    missed batches.
+
+    Args:
+        rate: Target pickups per second
+        batch_size: Pickups per INSERT batch / transaction
+        workers: Concurrent connections (and worker threads)
+        duration: Seconds to generate load for
+        seed: Random seed for the generated pickups
+        partitioned: Write contamination_events.pickup_time (db/schema_partitioned.sql)
+
+    Returns:
+        Dict with counts, elapsed time, throughput and latency percentiles (ms)
+    """
+    pool = ThreadedConnectionPool(workers, workers, **DB_CONFIG)
+    batches = queue.Queue(maxsize=workers * 2)
+    lock = threading.Lock()
+    latencies = []
+    totals = {'pickups': 0, 'events': 0, 'errors': 0}
+
+    def worker():
+        conn = pool.getconn()
+        try:
+            while True:
+                batch = batches.get()
+                if batch is None:
+                    break
+                started = time.perf_counter()
+                try:
+                    events = insert_batch(conn, batch, partitioned)
+                except Exception:
+                    # Count any failure: a dead worker would leave the producer
+                    # blocked on the full queue
+                    try:
+                        conn.rollback()
+                    except psycopg2.Error:
+                        pass
+                    with lock:
+                        totals['errors'] += 1
+                    continue
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+                    totals['pickups'] += len(batch)
+                    totals['events'] += events
+        finally:
+            pool.putconn(conn)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    rng = random.Random(seed)
+    interval = batch_size / float(rate)
+    started = time.perf_counter()
+    deadline = started + duration
+    planned = math.ceil(duration / interval)
+    queued = 0
+    next_batch = started
+    while next_batch < deadline and time.perf_counter() < deadline:
+        now = time.perf_counter()
+        if now - next_batch >= interval:
+            # Behind schedule (queue was full): skip the slots already past
+            next_batch += (now - next_batch) // interval * interval
+        elif next_batch > now:
+            time.sleep(next_batch - now)
+        try:
+            batches.put(generate_batch(rng, batch_size, datetime.now()),
+                        timeout=max(deadline - time.perf_counter(), 0.001))
+        except queue.Full:
+            break
+        queued += 1
+        next_batch += interval
+
+    for _ in threads:
+        batches.put(None)
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    pool.closeall()
+
+    latencies.sort()
+    return {
+        'target_rate': rate,
+        'elapsed_s': elapsed,
+        'pickups': totals['pickups'],
+        'events': totals['events'],
+        'failed_batches': totals['errors'],
+        'missed_batches': max(planned - queued, 0),
+        'pickups_per_s': totals['pickups'] / elapsed if elapsed else 0.0,
+        'events_per_s': totals['events'] / elapsed if elapsed else 0.0,
+        'batches': len(latencies),
+        'latency_ms': {
+            'p50': percentile(latencies, 50) * 1000,
+            'p95': percentile(latencies, 95) * 1000,
+            'p99': percentile(latencies, 99) * 1000,
+            'max': (latencies[-1] if latencies else 0.0) * 1000,
+        }
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Insert live pickups at a target rate and report throughput")
+    parser.add_argument('--rate', type=float, default=100.0, help="Target pickups per second")
+    parser.add_argument('--batch-size', type=int, default=50, help="Pickups per INSERT batch")
+    parser.add_argument('--workers', type=int, default=4, help="Concurrent connections")
+    parser.add_argument('--duration', type=float, default=60.0, help="Seconds to run")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--partitioned', action='store_true',
+                        default=os.getenv('DB_PARTITIONED', '').lower() in ('1', 'true', 'yes'),
+                        help="Target db/schema_partitioned.sql (also set by DB_PARTITIONED)")
+    args = parser.parse_args()
+
+    print("Generating live load...")
+    print(f"Target: {args.rate:.0f} pickups/s for {args.duration:.0f}s "
+          f"({args.workers} workers, batches of {args.batch_size})")
+
+    report = run_load(args.rate, args.batch_size, args.workers, args.duration, args.seed, args.partitioned)
+
+    print(f"\nInserted {report['pickups']} pickups and {report['events']} contamination events "
+          f"in {report['elapsed_s']:.1f}s")
+    print(f"Throughput: {report['pickups_per_s']:.1f} pickups/s "
+          f"({report['pickups_per_s'] / args.rate * 100:.0f}% of target), "
+          f"{report['events_per_s']:.1f} events/s")
+    latency = report['latency_ms']
+    print(f"Batch insert latency: p50 {latency['p50']:.1f}ms, p95 {latency['p95']:.1f}ms, "
+          f"p99 {latency['p99']:.1f}ms, max {latency['max']:.1f}ms")
+    if report['failed_batches']:
+        print(f"Failed batches: {report['failed_batches']}")
+    if report['missed_batches']:
+        print(f"Missed batches (database fell behind the target rate): {report['missed_batches']}")
@@ -0,0 +1,40 @@
+#!/bin/bash
+
+# Load per-partition seed files in parallel
+# Usage: db/load_partitions.sh <partition_dir> [jobs] [database]
+#
+# Expects the partitioned schema (db/schema_partitioned.sql) and db/seed.sql
+# to be loaded already. Files are written by the seed generators with
+# --partition-dir or --shard-dir; when the directory has a manifest.json
+# (sharded generation), exactly the files it lists are loaded.
+
+set -e  # Exit on any error
+
+PARTITION_DIR="$1"
+JOBS="${2:-4}"
+DB_NAME="${3:-recycling_contamination}"
+
+if [ -z "$PARTITION_DIR" ] || [ ! -d "$PARTITION_DIR" ]; then
+    echo "Usage: $0 <partition_dir> [jobs] [database]"
+    exit 1
+fi
+
+echo "📦 Loading partitions from $PARTITION_DIR into $DB_NAME ($JOBS parallel jobs)..."
+
+list_files() {
+    if [ -f "$PARTITION_DIR/manifest.json" ]; then
+        python3 -c 'import json, os, sys
+d = sys.argv[1]
+for shard in json.load(open(os.path.join(d, "manifest.json")))["shards"]:
+    sys.stdout.write(os.path.join(d, shard["file"]) + "\0")' "$PARTITION_DIR"
+    else
+        find "$PARTITION_DIR" -name '*.sql' ! -name 'finalize.sql' -print0 | sort -z
+    fi
+}
+
+list_files | xargs -0 -n 1 -P "$JOBS" psql "$DB_NAME" -q -v ON_ERROR_STOP=1 -f
+
+echo "🔧 Resetting sequences and analyzing..."
+psql "$DB_NAME" -q -v ON_ERROR_STOP=1 -f "$PARTITION_DIR/finalize.sql"
+
+echo "✅ Partitions loaded"
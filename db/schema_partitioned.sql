@@ -0,0 +1,314 @@
+-- Partitioned variant of schema.sql for multi-year / high-volume datasets
+--
+-- pickups is range-partitioned by month on pickup_time, so time-windowed
+-- queries (pickup_time >= CURRENT_DATE - INTERVAL '...') only touch the
+-- partitions covering the window.
+--
+-- contamination_events carries a denormalized copy of its pickup's
+-- pickup_time (filled in by trigger when an INSERT omits it), so the
+-- existing seed / trend scripts load unchanged and window queries can
+-- bound the events scan with the BRIN index on that column.
+--
+-- Usage:
+--   psql recycling_contamination -f db/schema_partitioned.sql
+--   psql recycling_contamination -f db/seed.sql
+--
+-- Then set DB_PARTITIONED=true for backend/ml_service/sarima_predictor.py.
+
+-- Drop tables if they exist (for easy re-running during POC)
+
+DROP TABLE IF EXISTS contamination_events CASCADE;
+
+DROP TABLE IF EXISTS contamination_categories CASCADE;
+
+DROP TABLE IF EXISTS pickups CASCADE;
+
+DROP TABLE IF EXISTS containers CASCADE;
+
+DROP TABLE IF EXISTS education_actions CASCADE;
+
+DROP TABLE IF EXISTS customers CASCADE;
+
+DROP TABLE IF EXISTS routes CASCADE;
+
+DROP TABLE IF EXISTS facilities CASCADE;
+
+DROP FUNCTION IF EXISTS ensure_monthly_partitions(DATE, DATE);
+
+DROP FUNCTION IF EXISTS fill_contamination_pickup_time();
+
+-- 1. Facilities (MRFs, depots, etc.)
+
+CREATE TABLE facilities (
+
+    facility_id      SERIAL PRIMARY KEY,
+
+    name             TEXT NOT NULL,
+
+    city             TEXT,
+
+    state            TEXT,
+
+    active           BOOLEAN NOT NULL DEFAULT TRUE,
+
+    created_at       TIMESTAMPTZ NOT NULL DEFAULT NOW()
+
+);
+
+-- 2. Routes
+
+CREATE TABLE routes (
+
+    route_id         SERIAL PRIMARY KEY,
+
+    facility_id      INTEGER NOT NULL REFERENCES facilities(facility_id),
+
+    route_code       TEXT NOT NULL UNIQUE,      
+
+    description      TEXT,
+
+    active           BOOLEAN NOT NULL DEFAULT TRUE,
+
+    created_at       TIMESTAMPTZ NOT NULL DEFAULT NOW()
+
+);
+
+-- 3. Customers (households, businesses, etc.)
+
+CREATE TABLE customers (
+
+    customer_id      SERIAL PRIMARY KEY,
+
+    external_ref     TEXT,                      
+
+    name             TEXT NOT NULL,             
+
+    customer_type    TEXT NOT NULL CHECK (customer_type IN ('residential', 'commercial')),
+
+    route_id         INTEGER NOT NULL REFERENCES routes(route_id),
+
+    address_line1    TEXT,
+
+    city             TEXT,
+
+    state            TEXT,
+
+    postal_code      TEXT,
+
+    active           BOOLEAN NOT NULL DEFAULT TRUE,
+
+    created_at       TIMESTAMPTZ NOT NULL DEFAULT NOW()
+
+);
+
+-- 4. Containers (bins/carts assigned to customers)
+
+CREATE TABLE containers (
+
+    container_id     SERIAL PRIMARY KEY,
+
+    customer_id      INTEGER NOT NULL REFERENCES customers(customer_id),
+
+    label            TEXT,                      
+
+    size_gallons     INTEGER,
+
+    stream_type      TEXT NOT NULL CHECK (
+
+                        stream_type IN ('single_stream', 'mixed_paper', 'glass_only', 'organics')
+
+                      ),
+
+    active           BOOLEAN NOT NULL DEFAULT TRUE,
+
+    created_at       TIMESTAMPTZ NOT NULL DEFAULT NOW()
+
+);
+
+-- 5. Pickups (one row per container lift, partitioned by month)
+
+-- The partition key has to be part of the primary key.
+
+CREATE TABLE pickups (
+
+    pickup_id        SERIAL,
+
+    container_id     INTEGER NOT NULL REFERENCES containers(container_id),
+
+    route_id         INTEGER NOT NULL REFERENCES routes(route_id),
+
+    pickup_time      TIMESTAMPTZ NOT NULL,
+
+    weight_kg        NUMERIC(10,2),             
+
+    driver_name      TEXT,
+
+    notes            TEXT,
+
+    created_at       TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+
+    PRIMARY KEY (pickup_id, pickup_time)
+
+) PARTITION BY RANGE (pickup_time);
+
+-- Catch-all for rows outside the pre-created monthly ranges
+
+CREATE TABLE pickups_default PARTITION OF pickups DEFAULT;
+
+-- 6. Contamination categories (lookup / dimension)
+
+CREATE TABLE contamination_categories (
+
+    category_id      SERIAL PRIMARY KEY,
+
+    code             TEXT NOT NULL UNIQUE,      
+
+    description      TEXT NOT NULL
+
+);
+
+-- 7. Contamination events (per pickup)
+
+CREATE TABLE contamination_events (
+
+    contamination_id SERIAL PRIMARY KEY,
+
+    pickup_id        INTEGER NOT NULL,
+
+    pickup_time      TIMESTAMPTZ NOT NULL,      -- copied from pickups.pickup_time
+
+    category_id      INTEGER NOT NULL REFERENCES contamination_categories(category_id),
+
+    severity         INTEGER NOT NULL CHECK (severity BETWEEN 1 AND 5),
+
+    estimated_contamination_pct NUMERIC(5,2),   
+
+    notes            TEXT,
+
+    created_at       TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+
+    FOREIGN KEY (pickup_id, pickup_time)
+
+        REFERENCES pickups (pickup_id, pickup_time) ON DELETE CASCADE
+
+);
+
+-- 8. Education / outreach actions to customers
+
+CREATE TABLE education_actions (
+
+    action_id        SERIAL PRIMARY KEY,
+
+    customer_id      INTEGER NOT NULL REFERENCES customers(customer_id),
+
+    action_date      DATE NOT NULL,
+
+    channel          TEXT NOT NULL CHECK (channel IN ('tag_on_bin', 'email', 'phone_call', 'site_visit', 'mail')),
+
+    description      TEXT,
+
+    created_at       TIMESTAMPTZ NOT NULL DEFAULT NOW()
+
+);
+
+-- Partition management
+
+-- Creates one pickups partition per month in [from_date, to_date].
+-- Partitions are named pickups_yYYYYmMM; existing ones are left alone.
+-- Call it again (e.g. monthly) to extend the range forward.
+
+CREATE FUNCTION ensure_monthly_partitions(from_date DATE, to_date DATE)
+RETURNS INTEGER AS $$
+DECLARE
+    month_start DATE := date_trunc('month', from_date)::date;
+    created     INTEGER := 0;
+    part_name   TEXT;
+BEGIN
+    WHILE month_start <= to_date LOOP
+        part_name := format('pickups_y%sm%s',
+                            to_char(month_start, 'YYYY'),
+                            to_char(month_start, 'MM'));
+        IF to_regclass(part_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF pickups FOR VALUES FROM (%L) TO (%L)',
+                part_name, month_start, (month_start + INTERVAL '1 month')::date
+            );
+            created := created + 1;
+        END IF;
+        month_start := (month_start + INTERVAL '1 month')::date;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Multi-year seed data starts in 2022; keep a year of headroom ahead
+
+SELECT ensure_monthly_partitions(DATE '2022-01-01', (CURRENT_DATE + INTERVAL '12 months')::date);
+
+-- Fill contamination_events.pickup_time from the parent pickup when omitted
+-- (seed.sql and the add_*_trend.sql scripts only supply pickup_id)
+
+CREATE FUNCTION fill_contamination_pickup_time()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.pickup_time IS NULL THEN
+        SELECT p.pickup_time INTO NEW.pickup_time
+        FROM pickups p
+        WHERE p.pickup_id = NEW.pickup_id;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_contamination_events_pickup_time
+
+    BEFORE INSERT ON contamination_events
+
+    FOR EACH ROW EXECUTE FUNCTION fill_contamination_pickup_time();
+
+-- Indexes for query performance
+
+-- Indexes created on the partitioned parent cascade to every partition
+
+-- Fast lookups by route + time (btree, per partition)
+
+CREATE INDEX idx_pickups_route_time
+
+    ON pickups (route_id, pickup_time);
+
+-- Compact time-range index; pickups arrive roughly in time order
+
+CREATE INDEX idx_pickups_time_brin
+
+    ON pickups USING BRIN (pickup_time);
+
+-- Fast lookup of pickups by container
+
+CREATE INDEX idx_pickups_container
+
+    ON pickups (container_id);
+
+-- Fast lookup of contamination events by pickup
+
+CREATE INDEX idx_contamination_events_pickup
+
+    ON contamination_events (pickup_id);
+
+-- Bounds event scans for the same time windows as pickups
+
+CREATE INDEX idx_contamination_events_time_brin
+
+    ON contamination_events USING BRIN (pickup_time);
+
+-- Fast lookup of customers by route
+
+CREATE INDEX idx_customers_route
+
+    ON customers (route_id);
+
+-- Fast lookup of education actions by customer and date
+
+CREATE INDEX idx_education_actions_customer_date
+
+    ON education_actions (customer_id, action_date);
+
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Per-partition export of generated seed data
+Writes one COPY-based load file per month so the partitioned schema
+(db/schema_partitioned.sql) can be bulk-loaded in parallel
+"""
+
+import os
+
+PICKUP_COLUMNS = [
+    'pickup_id', 'container_id', 'route_id', 'pickup_time',
+    'weight_kg', 'driver_name', 'notes'
+]
+
+CONTAMINATION_COLUMNS = [
+    'contamination_id', 'pickup_id', 'pickup_time', 'category_id',
+    'severity', 'estimated_contamination_pct', 'notes'
+]
+
+FINALIZE_FILE = 'finalize.sql'
+
+# Default --id-offset per generator. Load files carry explicit IDs, and
+# schema_partitioned.sql can't enforce a unique pickup_id (its primary key
+# includes pickup_time), so start past seed.sql's rows (well under 1,000)
+# and past each other so both generators' files can sit on top of seed.sql
+ID_OFFSETS = {'multi_year': 100000, 'enhanced': 1000000}
+
+
+def partition_key(timestamp):
+    """Monthly partition key, matching pickups_yYYYYmMM in schema_partitioned.sql"""
+    return timestamp.strftime('%Y_%m')
+
+
+def copy_value(value):
+    """Format a single value for PostgreSQL COPY text format"""
+    if value is None:
+        return '\\N'
+    if hasattr(value, 'strftime'):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    text = str(value)
+    return text.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+
+
+def copy_block(table, columns, rows):
+    """Build a COPY ... FROM stdin block for a list of row dicts"""
+    lines = [f"COPY {table} ({', '.join(columns)}) FROM stdin;"]
+    for row in rows:
+        lines.append('\t'.join(copy_value(row[col]) for col in columns))
+    lines.append('\\.')
+    lines.append('')
+    return lines
+
+
+def group_by_partition(pickups, contamination_events, id_offset=0):
+    """
+    Group pickups and their contamination events by monthly partition
+
+    Args:
+        pickups: List of pickup dicts (with pickup_id and pickup_time)
+        contamination_events: List of contamination event dicts
+        id_offset: Added to every pickup_id / contamination_id so the load
+            does not collide with rows already in the database
+
+    Returns:
+        Dict of partition key -> (pickup rows, contamination rows)
+    """
+    partitions = {}
+    pickup_times = {}
+
+    for p in pickups:
+        row = dict(p, pickup_id=p['pickup_id'] + id_offset)
+        pickup_times[p['pickup_id']] = p['pickup_time']
+        partitions.setdefault(partition_key(p['pickup_time']), ([], []))[0].append(row)
+
+    for c in contamination_events:
+        pickup_time = pickup_times.get(c['pickup_id'])
+        if pickup_time is None:
+            continue
+        row = dict(
+            c,
+            contamination_id=c['contamination_id'] + id_offset,
+            pickup_id=c['pickup_id'] + id_offset,
+            pickup_time=pickup_time
+        )
+        partitions[partition_key(pickup_time)][1].append(row)
+
+    return partitions
+
+
+def write_partition_files(pickups, contamination_events, output_dir, prefix='seed', id_offset=0):
+    """
+    Write one load file per monthly partition plus a finalize script
+
+    Each file holds the pickups for one month followed by their contamination
+    events, so files are independent of each other and can be loaded
+    concurrently (see db/load_partitions.sh). IDs are written explicitly;
+    finalize.sql moves the SERIAL sequences past them once all files are in.
+
+    Args:
+        pickups: List of pickup dicts
+        contamination_events: List of contamination event dicts
+        output_dir: Directory to write the files into (created if missing)
+        prefix: File name prefix, e.g. 'multi_year' -> multi_year_2022_01.sql
+        id_offset: See group_by_partition
+
+    Returns:
+        List of partition file paths, in partition order
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    partitions = group_by_partition(pickups, contamination_events, id_offset)
+
+    paths = []
+    for key in sorted(partitions):
+        partition_pickups, partition_events = partitions[key]
+        path = os.path.join(output_dir, f"{prefix}_{key}.sql")
+        write_load_file(path, f"Partition {key.replace('_', '-')}", partition_pickups, partition_events)
+        paths.append(path)
+
+    write_finalize(output_dir)
+    return paths
+
+
+def write_load_file(path, title, pickups, contamination_events):
+    """Write one self-contained COPY load file: pickups, then their contamination events"""
+    lines = [
+        f"-- {title}: {len(pickups)} pickups, {len(contamination_events)} contamination events",
+        ''
+    ]
+    lines += copy_block('pickups', PICKUP_COLUMNS, pickups)
+    if contamination_events:
+        lines += copy_block('contamination_events', CONTAMINATION_COLUMNS, contamination_events)
+
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines))
+
+
+def write_finalize(output_dir):
+    """Write finalize.sql: fail on duplicate pickup IDs, reset the SERIAL sequences past the loaded IDs and analyze"""
+    with open(os.path.join(output_dir, FINALIZE_FILE), 'w') as f:
+        f.write('\n'.join([
+            '-- Run once after every partition file has loaded',
+            '-- pickup_id is only unique per partition, so check for colliding load files',
+            'DO $$',
+            'BEGIN',
+            '    IF EXISTS (SELECT 1 FROM pickups GROUP BY pickup_id HAVING COUNT(*) > 1) THEN',
+            "        RAISE EXCEPTION 'duplicate pickup_id values loaded - regenerate with a different --id-offset';",
+            '    END IF;',
+            'END $$;',
+            "SELECT setval(pg_get_serial_sequence('pickups', 'pickup_id'),"
+            " (SELECT MAX(pickup_id) FROM pickups));",
+            "SELECT setval(pg_get_serial_sequence('contamination_events', 'contamination_id'),"
+            " (SELECT MAX(contamination_id) FROM contamination_events));",
+            'ANALYZE pickups;',
+            'ANALYZE contamination_events;',
+            ''
+        ]))
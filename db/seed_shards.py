@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Parallel sharded seed generation
+Splits seed generation into (route, month) shards and runs them across a
+process pool. Every shard draws from its own NumPy stream, spawned from one
+SeedSequence in shard order, and writes its own COPY load file, so the
+output is bit-identical for any number of workers. manifest.json lists the
+files for parallel loading (db/load_partitions.sh).
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+
+from seed_export import write_load_file, write_finalize
+
+MANIFEST_FILE = 'manifest.json'
+
+
+def month_ranges(start, end):
+    """(first day, last day) of each calendar month overlapping start..end, clipped"""
+    ranges = []
+    first = start
+    while first <= end:
+        next_month = date(first.year + first.month // 12, first.month % 12 + 1, 1)
+        last = min(next_month - timedelta(days=1), end)
+        ranges.append((first, last))
+        first = next_month
+    return ranges
+
+
+def plan_shards(route_containers, start, end, first_id=1, id_offset=0):
+    """
+    One shard per route per calendar month, in a fixed order
+
+    Each shard gets a block of IDs big enough for one pickup per container
+    per day (and at most one contamination event per pickup), so IDs don't
+    depend on what other shards generate or on which worker runs them.
+
+    Args:
+        route_containers: Dict of route_id -> container IDs
+        start: First day (date)
+        end: Last day (date)
+        first_id: First pickup / contamination ID
+        id_offset: Added to every ID (see seed_export.group_by_partition)
+
+    Returns:
+        List of shard dicts (route_id, containers, start / end of the
+        shard, origin = first day of the whole plan, first_id)
+    """
+    shards = []
+    next_id = first_id + id_offset
+    for first, last in month_ranges(start, end):
+        for route_id in sorted(route_containers):
+            containers = list(route_containers[route_id])
+            shards.append({
+                'index': len(shards),
+                'route_id': route_id,
+                'containers': containers,
+                'start': first,
+                'end': last,
+                'origin': start,
+                'first_id': next_id,
+            })
+            next_id += len(containers) * ((last - first).days + 1)
+    return shards
+
+
+def shard_days(shard):
+    """Days of a shard as a datetime64[D] array"""
+    return np.arange(np.datetime64(shard['start']), np.datetime64(shard['end']) + 1)
+
+
+def shard_file_name(prefix, shard):
+    """e.g. multi_year_2022_01_r03.sql - sorts by month, then route"""
+    return f"{prefix}_{shard['start']:%Y_%m}_r{shard['route_id']:02d}.sql"
+
+
+def run_shard(task):
+    """Generate one shard with its own RNG stream and write its load file (runs in a worker)"""
+    generate, shard, seed_sequence, output_dir, prefix = task
+    rng = np.random.default_rng(seed_sequence)
+    pickups, contamination_events = generate(shard, rng)
+
+    name = shard_file_name(prefix, shard)
+    title = f"Route {shard['route_id']}, {shard['start']} to {shard['end']}"
+    write_load_file(os.path.join(output_dir, name), title, pickups, contamination_events)
+    return {
+        'file': name,
+        'route_id': shard['route_id'],
+        'start': shard['start'].isoformat(),
+        'end': shard['end'].isoformat(),
+        'pickups': len(pickups),
+        'contamination_events': len(contamination_events),
+    }
+
+
+def generate_sharded(generate, shards, output_dir, prefix, seed=42, workers=None):
+    """
+    Run every shard across a process pool and write the manifest
+
+    Args:
+        generate: Module-level function (shard, rng) -> (pickup dicts,
+            contamination event dicts), in seed_export column format
+        shards: Shards from plan_shards
+        output_dir: Directory for the shard files (created if missing)
+        prefix: File name prefix
+        seed: Root seed; shard i uses SeedSequence(seed).spawn(len(shards))[i]
+        workers: Worker processes (default: CPU count; 1 runs in-process)
+
+    Returns:
+        Manifest dict
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(shards))
+    tasks = [(generate, shard, seed_sequence, output_dir, prefix)
+             for shard, seed_sequence in zip(shards, seed_sequences)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        entries = [run_shard(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            entries = list(executor.map(run_shard, tasks, chunksize=max(len(tasks) // (workers * 4), 1)))
+
+    write_finalize(output_dir)
+    manifest = {
+        'prefix': prefix,
+        'seed': seed,
+        'shards': entries,
+        'pickups': sum(entry['pickups'] for entry in entries),
+        'contamination_events': sum(entry['contamination_events'] for entry in entries),
+    }
+    with open(os.path.join(output_dir, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+        f.write('\n')
+    return manifest
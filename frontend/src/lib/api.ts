@@ -30,6 +30,17 @@ export interface PredictiveSearch {
   insight: string;
 }
 
+export interface RouteDecomposition {
+  routeId: number;
+  routeCode: string;
+  dates: string[];
+  observed: number[];
+  trend: number[];
+  weekly: number[];
+  yearly: number[];
+  residual: number[];
+}
+
 export const contaminationApi = {
   getByRoute: async (routeId: number): Promise<ContaminationEvent[]> => {
     const response = await api.get(`/api/contamination/route/${routeId}`);
@@ -49,6 +60,14 @@ export const contaminationApi = {
     const response = await api.get('/api/contamination/predictive-searches');
     return response.data;
   },
+
+  getDecomposition: async (days?: number): Promise<RouteDecomposition[]> => {
+    const params = new URLSearchParams();
+    if (days) params.append('days', String(days));
+
+    const response = await api.get(`/api/contamination/decomposition?${params.toString()}`);
+    return response.data;
+  },
 };
 
 export interface GeneratedEmail {